@@ -1,49 +1,228 @@
 import asyncio
 import argparse
+import importlib.util
 import sys
+from agent_sigpesq.core.structured_logging import configure_logging, get_logger, shutdown_logging
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.concurrency import ConcurrencyController
+from agent_sigpesq.core.work_units import Shard, load_pending_units, parse_years
+from agent_sigpesq.services.delta_stage import ReportDeltaStage
 from agent_sigpesq.services.reports_service import SigpesqReportService
-from agent_sigpesq.strategies import (
-    ResearchGroupsDownloadStrategy,
-    ProjectsDownloadStrategy,
-    AdvisorshipsDownloadStrategy
-)
+from agent_sigpesq.services.sharded_executor import LocalShardExecutor
+
+logger = get_logger("agent")
+
+def parse_shard(spec: str) -> Shard:
+    """Parses a --shard value, reporting errors through argparse."""
+    try:
+        return Shard.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+CATEGORIES = ["groups", "projects", "advisorships"]
+
+# Report category name of each category key, as used in the delta store
+CATEGORY_NAMES = {
+    "groups": "Research Groups",
+    "projects": "Research Projects",
+    "advisorships": "Advisorships",
+}
+
+# Categories selected by each subcommand
+COMMAND_CATEGORIES = {
+    "download-groups": ["groups"],
+    "download-projects": ["projects"],
+    "download-advisorships": ["advisorships"],
+}
+
+def parse_years_arg(spec: str):
+    """Parses a --years value, reporting errors through argparse."""
+    try:
+        return parse_years(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_categories(spec: str):
+    """Parses a comma-separated --categories value."""
+    categories = [category.strip() for category in spec.split(",") if category.strip()]
+    unknown = sorted(set(categories) - set(CATEGORIES))
+    if not categories or unknown:
+        raise argparse.ArgumentTypeError(f"Invalid categories '{spec}', choose from: {', '.join(CATEGORIES)}.")
+    return categories
+
+def parse_delta_key(spec: str):
+    """
+    Parses a --delta-key value of the form 'CATEGORY=COL[,COL...]', where
+    CATEGORY is a category key (e.g. 'groups') or its report name.
+    """
+    category, _, columns = spec.partition("=")
+    category = category.strip()
+    if not category or not columns:
+        raise argparse.ArgumentTypeError(f"Invalid delta key '{spec}', expected CATEGORY=COL[,COL...].")
+    if category not in CATEGORY_NAMES.values():
+        if category not in CATEGORY_NAMES:
+            raise argparse.ArgumentTypeError(f"Invalid delta key category '{category}', choose from: {', '.join(CATEGORIES)}.")
+        category = CATEGORY_NAMES[category]
+    return category, [column.strip() for column in columns.split(",")]
+
+def parse_concurrency(spec: str):
+    """Parses a --concurrency value of the form 'MIN-MAX' (or a single maximum)."""
+    low, _, high = spec.partition("-")
+    try:
+        bounds = (int(low), int(high)) if high else (1, int(low))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid concurrency '{spec}', expected MIN-MAX, e.g. 1-4.")
+    if bounds[0] < 1 or bounds[1] < bounds[0]:
+        raise argparse.ArgumentTypeError(f"Invalid concurrency '{spec}', expected 1 <= MIN <= MAX.")
+    return bounds
+
+def parse_positive_int(spec: str) -> int:
+    """Parses an integer option that must be at least 1."""
+    try:
+        value = int(spec)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid integer '{spec}'.")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"Invalid value {value}, expected at least 1.")
+    return value
 
 async def main():
-    parser = argparse.ArgumentParser(description="Sigpesq Report Downloader Agent")
+    # Selection, accepted before or after the subcommand. Defaults are suppressed
+    # so that a subcommand's defaults never overwrite values given before it.
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument("--categories", type=parse_categories, default=argparse.SUPPRESS, metavar="LIST",
+                           help=f"Comma-separated categories to download ({', '.join(CATEGORIES)}); default: all")
+    selection.add_argument("--years", type=parse_years_arg, default=argparse.SUPPRESS, metavar="SPEC",
+                           help="Advisorships years to download, e.g. 2024-2025, current, previous-current or 2019,2022")
+
+    parser = argparse.ArgumentParser(description="Sigpesq Report Downloader Agent", parents=[selection])
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
     # Subcommands
-    subparsers.add_parser("download-all", help="Download all reports (default)")
-    subparsers.add_parser("download-groups", help="Download only Research Groups reports")
-    subparsers.add_parser("download-projects", help="Download only Research Projects reports")
-    subparsers.add_parser("download-advisorships", help="Download only Advisorships reports")
+    subparsers.add_parser("download-all", help="Download all reports (default)", parents=[selection])
+    subparsers.add_parser("download-groups", help="Download only Research Groups reports", parents=[selection])
+    subparsers.add_parser("download-projects", help="Download only Research Projects reports", parents=[selection])
+    subparsers.add_parser("download-advisorships", help="Download only Advisorships reports", parents=[selection])
+
+    # Work distribution
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/n",
+                        help="Run only shard i of n (1-based), e.g. --shard 2/4")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of local processes, each running its own browser on one shard")
+
+    parser.add_argument("--concurrency", type=parse_concurrency, default=None, metavar="MIN-MAX",
+                        help="Download several units at once on each browser, auto-tuning the count within "
+                             "these bounds from the portal latency, e.g. --concurrency 1-4")
+
+    # Delta storage
+    parser.add_argument("--deltas", action="store_true",
+                        help="Store the changes between consecutive downloads under reports/_deltas")
+    parser.add_argument("--delta-key", type=parse_delta_key, action="append", default=[], metavar="CATEGORY=COLS",
+                        help="Row identity columns for a category, e.g. --delta-key groups=Codigo (repeatable)")
+    parser.add_argument("--no-keep-downloads", dest="keep_downloads", action="store_false",
+                        help="With --deltas, delete each full download once its delta or snapshot is recorded")
+    parser.add_argument("--snapshot-every", type=parse_positive_int, default=7,
+                        help="Number of deltas between full snapshots (default: 7)")
+
+    # Failure handling
+    parser.add_argument("--breaker-threshold", type=parse_positive_int, default=3,
+                        help="Consecutive download failures before the remaining units are skipped (default: 3)")
+    parser.add_argument("--breaker-recovery", type=float, default=30.0,
+                        help="Seconds to wait before probing the portal for recovery (default: 30)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Run only the units that failed or were skipped in the last run (from reports/summary.json)")
+
+    # Browser
+    parser.add_argument("--profile-dir", default=None, metavar="DIR",
+                        help="Persistent browser profile directory, so portal assets stay cached across runs")
+    parser.add_argument("--cache-size", type=int, default=100, metavar="MIB",
+                        help="HTTP cache size cap of each persistent profile, in MiB (default: 100)")
+
+    # Logging
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Minimum level of the JSON log lines written to stdout (default: INFO)")
 
     args = parser.parse_args()
+    args.categories = getattr(args, "categories", None)
+    args.years = getattr(args, "years", None)
+    if args.shard is not None and args.workers > 1:
+        parser.error("--shard and --workers cannot be combined.")
+    if not args.keep_downloads and not args.deltas:
+        parser.error("--no-keep-downloads requires --deltas.")
+    # The portal serves .xlsx reports, which the delta stage reads with openpyxl
+    if args.deltas and importlib.util.find_spec("openpyxl") is None:
+        parser.error("--deltas requires openpyxl: pip install agent_sigpesq[deltas]")
+    if args.categories is not None and args.command in COMMAND_CATEGORIES:
+        parser.error(f"--categories cannot be combined with {args.command}.")
+    categories = COMMAND_CATEGORIES.get(args.command, args.categories)
+    if args.years is not None and categories is not None and "advisorships" not in categories:
+        parser.error("--years only applies to advisorships, which is not selected.")
+
+    configure_logging(level=args.log_level)
+    try:
+        success = await run_job(args)
+    finally:
+        # Flush pending log lines before exiting
+        shutdown_logging()
+
+    if not success:
+        sys.exit(1)
 
-    strategies = None
-    if args.command == "download-groups":
-        strategies = [ResearchGroupsDownloadStrategy()]
-        print("Configuration: Downloading Research Groups only.")
-    elif args.command == "download-projects":
-        strategies = [ProjectsDownloadStrategy()]
-        print("Configuration: Downloading Research Projects only.")
-    elif args.command == "download-advisorships":
-        strategies = [AdvisorshipsDownloadStrategy()]
-        print("Configuration: Downloading Advisorships only.")
+async def run_job(args) -> bool:
+    """Runs the download job configured by the command line arguments."""
+    categories = COMMAND_CATEGORIES.get(args.command, args.categories)
+    if categories is None:
+        logger.info("Configuration: Downloading ALL reports.")
     else:
-        print("Configuration: Downloading ALL reports.")
+        logger.info(f"Configuration: Downloading {', '.join(categories)} only.")
+    if args.years is not None:
+        logger.info(f"Configuration: Advisorships years {sorted(args.years)}.")
 
-    print("Starting Sigpesq Report Download Job...")
+    delta_stage = None
+    if args.deltas:
+        delta_stage = ReportDeltaStage(download_dir="reports", key_columns=dict(args.delta_key),
+                                       snapshot_every=args.snapshot_every, keep_downloads=args.keep_downloads)
+
+    circuit_breaker = CircuitBreaker(failure_threshold=args.breaker_threshold, recovery_timeout=args.breaker_recovery)
+
+    concurrency = None
+    if args.concurrency is not None:
+        concurrency = ConcurrencyController(min_workers=args.concurrency[0], max_workers=args.concurrency[1])
+
+    only_units = None
+    if args.resume:
+        try:
+            only_units = load_pending_units("reports")
+        except FileNotFoundError:
+            logger.error("Cannot resume: reports/summary.json not found.")
+            return False
+        logger.info(f"Resuming {len(only_units)} pending work units: {sorted(only_units)}")
+        if not only_units:
+            return True
+
+    logger.info("Starting Sigpesq Report Download Job...")
     
     # Run in headless mode and save reports to 'reports' folder
-    service = SigpesqReportService(headless=True, download_dir="reports", strategies=strategies)
-    success = await service.run()
+    if args.workers > 1:
+        executor = LocalShardExecutor(workers=args.workers, headless=True, download_dir="reports", delta_stage=delta_stage,
+                                      circuit_breaker=circuit_breaker, only_units=only_units,
+                                      categories=categories, years=args.years,
+                                      profile_dir=args.profile_dir, cache_size_mb=args.cache_size,
+                                      concurrency=concurrency)
+        success = await executor.run()
+    else:
+        service = SigpesqReportService(headless=True, download_dir="reports", shard=args.shard,
+                                       delta_stage=delta_stage, circuit_breaker=circuit_breaker, only_units=only_units,
+                                       categories=categories, years=args.years,
+                                       profile_dir=args.profile_dir, cache_size_mb=args.cache_size,
+                                       concurrency=concurrency)
+        success = await service.run()
     
     if success:
-        print("Report download job completed successfully!")
+        logger.info("Report download job completed successfully!")
     else:
-        print("Report download job failed.")
-        sys.exit(1)
+        logger.error("Report download job failed.")
+    return success
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -2,9 +2,28 @@
 Core module for Agent Sigpesq.
 
 Contains fundamental abstractions and factories used throughout the library, 
-including the `BaseAgent` and `BrowserFactory`.
+including the `BaseAgent`, `BrowserFactory`, the `CircuitBreaker`, the
+`ConcurrencyController`, the work-unit sharding types and the structured
+logging setup.
 """
 from .base_agent import BaseAgent
 from .browser_factory import BrowserFactory
+from .circuit_breaker import CircuitBreaker
+from .concurrency import ConcurrencyController
+from .structured_logging import configure_logging, get_logger, log_context, shutdown_logging
+from .work_units import DownloadedReport, Shard, UnitResult, WorkUnit
 
-__all__ = ["BaseAgent", "BrowserFactory"]
+__all__ = [
+    "BaseAgent",
+    "BrowserFactory",
+    "CircuitBreaker",
+    "ConcurrencyController",
+    "DownloadedReport",
+    "Shard",
+    "UnitResult",
+    "WorkUnit",
+    "configure_logging",
+    "get_logger",
+    "log_context",
+    "shutdown_logging",
+]
@@ -1,35 +1,139 @@
+"""
+Module for creating browser contexts.
+
+Contexts are ephemeral by default. Optionally they use a persistent Chromium
+profile, so the portal's static assets stay in the HTTP cache across runs.
+"""
+
+import os
+from typing import IO, Optional, Tuple
 from playwright.async_api import BrowserContext, Playwright
 
+from agent_sigpesq.core.structured_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+LOCK_FILENAME = ".agent-lock"
+
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080"
+]
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+
+def _try_lock(path: str) -> Optional[IO]:
+    """
+    Takes an exclusive, non-blocking lock on `path`.
+
+    The lock belongs to the open file and is released by the OS when the file
+    is closed or the process dies, so a crashed run never leaves a stale lock.
+
+    Returns:
+        Optional[IO]: The open lock file, or None if another run holds the lock.
+    """
+    lock_file = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
 class BrowserFactory:
     """
     Factory for creating Playwright browser contexts.
     """
-    
+
     @staticmethod
-    async def create_browser_context(playwright: Playwright, headless: bool = True) -> BrowserContext:
+    async def create_browser_context(playwright: Playwright, headless: bool = True, profile_dir: Optional[str] = None,
+                                     cache_size_mb: int = 100, max_profile_slots: int = 8) -> BrowserContext:
         """
         Creates and configures a Chrome browser context.
-        
+
+        By default the context is ephemeral. With `profile_dir`, the context
+        uses a persistent Chromium profile, so the portal's scripts and
+        WebForms resources stay in the HTTP cache between runs.
+
+        Chromium allows a single browser per profile, so the profile directory
+        holds numbered slots (`slot-0`, `slot-1`, ...), each guarded by a lock
+        file. Every run takes the first free slot, and concurrent runs (e.g.
+        shards) each warm their own. When every slot is busy the run falls
+        back to an ephemeral context.
+
         Args:
             playwright: The Playwright instance.
             headless (bool): Whether to run in headless mode.
-            
+            profile_dir (Optional[str]): Directory of the persistent profiles; ephemeral when None.
+            cache_size_mb (int): HTTP cache size cap per profile slot, in MiB;
+                Chromium evicts the least recently used entries beyond it.
+            max_profile_slots (int): Maximum number of concurrent profile slots.
+
         Returns:
             BrowserContext: Configured browser context.
         """
+        if profile_dir is not None:
+            slot_dir, lock_file = BrowserFactory._acquire_profile_slot(profile_dir, max_profile_slots)
+            if slot_dir is not None:
+                try:
+                    context = await playwright.chromium.launch_persistent_context(
+                        slot_dir,
+                        headless=headless,
+                        args=BROWSER_ARGS + [f"--disk-cache-size={cache_size_mb * 1024 * 1024}"],
+                        accept_downloads=True,
+                        **CONTEXT_OPTIONS
+                    )
+                except Exception:
+                    lock_file.close()
+                    raise
+                # Closing a persistent context also closes its browser; free the slot then
+                context.on("close", lambda _: lock_file.close())
+                logger.info(f"Using persistent browser profile {slot_dir} (cache cap: {cache_size_mb} MiB).")
+                return context
+
+            logger.warning(f"All {max_profile_slots} browser profile slots in {profile_dir} are in use; "
+                           f"using an ephemeral profile.")
+
         browser = await playwright.chromium.launch(
             headless=headless,
-            args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--window-size=1920,1080"
-            ]
+            args=BROWSER_ARGS
         )
-        
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        
+
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+
         return context
+
+    @staticmethod
+    def _acquire_profile_slot(profile_dir: str, max_profile_slots: int) -> Tuple[Optional[str], Optional[IO]]:
+        """
+        Locks the first free profile slot.
+
+        Returns:
+            Tuple: The slot directory and its open lock file, or (None, None)
+            when every slot is in use.
+        """
+        os.makedirs(profile_dir, exist_ok=True)
+        for slot in range(max_profile_slots):
+            slot_dir = os.path.join(profile_dir, f"slot-{slot}")
+            os.makedirs(slot_dir, exist_ok=True)
+            lock_file = _try_lock(os.path.join(slot_dir, LOCK_FILENAME))
+            if lock_file is not None:
+                return slot_dir, lock_file
+        return None, None
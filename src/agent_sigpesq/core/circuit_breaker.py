@@ -0,0 +1,179 @@
+"""
+Module for the circuit breaker.
+
+When the Sigpesq portal is slow or down, every report generation waits out its
+full download timeout. The `CircuitBreaker` counts consecutive failures shared
+across the service and all strategies; once the threshold is reached it opens,
+so the remaining work units can be skipped instead of waiting, and it only lets
+work through again after a recovery probe succeeds.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from agent_sigpesq.core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with timed recovery probes.
+
+    States:
+        closed: Requests flow normally; failures are counted.
+        open: Requests are rejected until the recovery timeout elapses.
+        half_open: A single trial request is allowed; its outcome closes or
+            re-opens the circuit.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        recovery_timeout (float): Seconds to wait before probing an open circuit.
+        probe_attempts (int): Recovery probes made before giving up, counted
+            across failed half-open trials until the circuit closes again, so a
+            portal that serves pages but cannot generate reports is not probed
+            (and trialled) once per remaining unit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0, probe_attempts: int = 1):
+        """
+        Initializes the CircuitBreaker.
+        """
+        if failure_threshold < 1:
+            raise ValueError(f"failure_threshold must be at least 1, got {failure_threshold}.")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_attempts = probe_attempts
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_finished: Optional[asyncio.Event] = None
+        self._recovery_attempts = 0
+
+    @property
+    def state(self) -> str:
+        """Returns the current state: "closed", "open" or "half_open"."""
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently being rejected."""
+        return self._state == OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a request may proceed.
+
+        An open circuit moves to half-open once the recovery timeout has
+        elapsed, and then lets a single trial request through.
+
+        Returns:
+            bool: True if the request may proceed, False if it should be skipped.
+        """
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            logger.info("Circuit breaker recovery timeout elapsed; allowing a trial request.")
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+
+        if self._state == CLOSED:
+            return True
+        if self._state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    async def acquire(self) -> bool:
+        """
+        Checks whether a request may proceed, like `allow_request`, but waits
+        for the outcome of an in-flight half-open trial instead of rejecting
+        concurrent requests while it runs.
+
+        Returns:
+            bool: True if the request may proceed, False if it should be skipped.
+        """
+        while True:
+            if self.allow_request():
+                return True
+            if not (self._state == HALF_OPEN and self._trial_in_flight):
+                return False
+            if self._trial_finished is None:
+                self._trial_finished = asyncio.Event()
+            await self._trial_finished.wait()
+
+    def _finish_trial(self):
+        """Wakes the requests waiting in `acquire` for the trial's outcome."""
+        self._trial_in_flight = False
+        if self._trial_finished is not None:
+            self._trial_finished.set()
+            self._trial_finished = None
+
+    def record_success(self):
+        """Records a successful request, closing the circuit."""
+        if self._state != CLOSED:
+            logger.info("Circuit breaker closed: the portal has recovered.")
+        self._state = CLOSED
+        self._failures = 0
+        self._recovery_attempts = 0
+        self._finish_trial()
+
+    def record_failure(self):
+        """Records a failed or timed-out request, opening the circuit when needed."""
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                logger.warning(
+                    f"Circuit breaker opened after {self._failures} consecutive failures; "
+                    f"skipping work for {self.recovery_timeout:.0f}s."
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._finish_trial()
+
+    async def probe(self, check: Callable[[], Awaitable[bool]]) -> bool:
+        """
+        Waits for the recovery timeout and probes the portal with `check`.
+
+        On a successful probe the circuit becomes half-open, so the next
+        request runs as the trial; otherwise it stays open. Once
+        `probe_attempts` probes have been made since the circuit last closed,
+        it gives up right away.
+
+        Args:
+            check: Coroutine function returning True when the portal responds.
+
+        Returns:
+            bool: True if the portal recovered, False otherwise.
+        """
+        while True:
+            if self._state != OPEN:
+                return True
+            if self._recovery_attempts >= self.probe_attempts:
+                logger.warning(f"Giving up on recovery after {self._recovery_attempts} probes.")
+                return False
+            self._recovery_attempts += 1
+            attempt = self._recovery_attempts
+
+            remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+            logger.info(f"Probing portal for recovery (attempt {attempt}/{self.probe_attempts})...")
+            try:
+                healthy = await check()
+            except Exception as e:
+                logger.warning(f"Recovery probe failed: {e}")
+                healthy = False
+
+            if healthy:
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+                return True
+
+            self._state = HALF_OPEN
+            self.record_failure()
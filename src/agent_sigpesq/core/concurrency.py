@@ -0,0 +1,171 @@
+"""
+Module for auto-tuned download concurrency.
+
+How many reports the Sigpesq portal can generate in parallel is unknown and
+changes with its load: too few workers waste time, too many make every report
+slower. The `ConcurrencyController` picks an initial worker count from a
+latency preflight and then adjusts it during the run, AIMD-style (additive
+increase, multiplicative decrease), from the observed download latencies and
+errors, always within the configured bounds.
+"""
+
+import math
+import time
+from typing import Dict, Optional
+
+from agent_sigpesq.core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConcurrencyController:
+    """
+    Additive-increase, multiplicative-decrease limit on concurrent downloads.
+
+    After a full window of fast, successful downloads (one per current worker)
+    the limit grows by one; a failed or slow download shrinks it by
+    `decrease_factor`. Only downloads started after the last change count
+    towards the next one, so a burst of slow downloads already in flight
+    shrinks the limit once, not once per download.
+
+    Report sizes differ widely between categories, so a download is compared
+    with the latency baseline of its own category: the fastest successful
+    download of that category seen so far.
+
+    Attributes:
+        min_workers (int): Lower bound of the worker count.
+        max_workers (int): Upper bound of the worker count.
+        latency_tolerance (float): A download is slow when it takes longer than
+            this multiple of its category's latency baseline.
+        decrease_factor (float): Factor applied to the limit on a failed or slow download.
+        slow_navigation (float): Navigation latency, in seconds, at which the
+            preflight starts with `min_workers`.
+        slow_report (float): Preflight report latency, in seconds, at which the
+            preflight starts with `min_workers`.
+    """
+
+    def __init__(self, min_workers: int = 1, max_workers: int = 4, latency_tolerance: float = 2.0,
+                 decrease_factor: float = 0.5, slow_navigation: float = 5.0, slow_report: float = 60.0):
+        """
+        Initializes the ConcurrencyController.
+        """
+        if min_workers < 1:
+            raise ValueError(f"min_workers must be at least 1, got {min_workers}.")
+        if max_workers < min_workers:
+            raise ValueError(f"max_workers ({max_workers}) must not be below min_workers ({min_workers}).")
+        if not 0 < decrease_factor < 1:
+            raise ValueError(f"decrease_factor must be between 0 and 1, got {decrease_factor}.")
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.slow_navigation = slow_navigation
+        self.slow_report = slow_report
+        self._baselines: Dict[str, float] = {}
+        self._limit = min_workers
+        self._changed_at = time.monotonic()
+        self._window_successes = 0
+
+    @property
+    def limit(self) -> int:
+        """Returns the current number of concurrent downloads allowed."""
+        return self._limit
+
+    def latency_target(self, category: str) -> Optional[float]:
+        """
+        Returns the seconds above which a download of `category` counts as
+        slow, or None until one of its downloads has succeeded.
+        """
+        baseline = self._baselines.get(category)
+        return baseline * self.latency_tolerance if baseline is not None else None
+
+    def calibrate(self, navigation_seconds: float, report_seconds: Optional[float],
+                  category: Optional[str] = None) -> int:
+        """
+        Picks the initial worker count from the preflight latencies.
+
+        Each latency is compared with its "slow" threshold (`slow_navigation`,
+        `slow_report`): the more headroom the slower of the two leaves, the
+        more workers the run starts with. The preflight report also seeds the
+        latency baseline of its category.
+
+        Args:
+            navigation_seconds (float): Time taken to load the reports page.
+            report_seconds (Optional[float]): Time taken to download the
+                preflight report, or None if it failed.
+            category (Optional[str]): The category of the preflight report.
+
+        Returns:
+            int: The initial worker count.
+        """
+        if report_seconds is None:
+            # The portal could not even produce one report; start cautiously
+            limit = self.min_workers
+            report = "failed"
+        else:
+            headroom = min(
+                self.slow_navigation / max(navigation_seconds, 1e-3),
+                self.slow_report / max(report_seconds, 1e-3),
+            )
+            limit = self._clamp(math.floor(headroom))
+            report = f"{report_seconds:.1f}s"
+            if category is not None:
+                self._update_baseline(category, report_seconds)
+
+        self._set_limit(limit, f"preflight (navigation {navigation_seconds:.1f}s, report {report})")
+        return limit
+
+    def record(self, started_at: float, latency: float, success: bool, category: Optional[str] = None):
+        """
+        Adjusts the limit from the outcome of one download.
+
+        Args:
+            started_at (float): When the download started (`time.monotonic()`).
+            latency (float): How long the download took, in seconds.
+            success (bool): Whether the download succeeded.
+            category (Optional[str]): The category of the report, whose latency
+                baseline the download is compared with.
+        """
+        target = self.latency_target(category) if category is not None else None
+        if success and category is not None:
+            self._update_baseline(category, latency)
+
+        if started_at < self._changed_at:
+            # Started under the previous limit; it says nothing about this one
+            return
+
+        slow = target is not None and latency > target
+        if not success or slow:
+            reason = "download failed" if not success else f"{category} download took {latency:.1f}s > {target:.1f}s"
+            self._set_limit(self._clamp(math.floor(self._limit * self.decrease_factor)), reason)
+            return
+
+        self._window_successes += 1
+        if self._window_successes >= self._limit and self._limit < self.max_workers:
+            self._set_limit(self._limit + 1, f"{self._window_successes} downloads within target")
+
+    def _update_baseline(self, category: str, latency: float):
+        """Keeps the fastest successful latency of each category."""
+        baseline = self._baselines.get(category)
+        if baseline is None or latency < baseline:
+            self._baselines[category] = latency
+            logger.debug(f"Latency baseline for {category}: {latency:.1f}s.")
+
+    def _clamp(self, limit: int) -> int:
+        return max(self.min_workers, min(self.max_workers, limit))
+
+    def _set_limit(self, limit: int, reason: str):
+        """Applies and logs a decision, starting a new observation window."""
+        if limit > self._limit:
+            action = "increase"
+        elif limit < self._limit:
+            action = "decrease"
+        else:
+            action = "hold"
+        logger.info(
+            f"Concurrency {action}: {self._limit} -> {limit} workers "
+            f"(bounds {self.min_workers}-{self.max_workers}): {reason}."
+        )
+        self._limit = limit
+        self._changed_at = time.monotonic()
+        self._window_successes = 0
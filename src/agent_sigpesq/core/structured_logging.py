@@ -0,0 +1,168 @@
+"""
+Module for non-blocking structured logging.
+
+Log records are pushed onto an in-memory queue by the caller and written by a
+background thread as JSON lines, so a slow stdout or pipe never blocks the
+event loop. Each line carries the run id of the process and the category, year
+and phase of the work being done, taken from context variables that follow
+asyncio tasks.
+"""
+
+import contextvars
+import json
+import logging
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO, Union
+
+LOGGER_NAME = "agent_sigpesq"
+
+_category: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("category", default=None)
+_year: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("year", default=None)
+_phase: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("phase", default=None)
+
+_run_id: Optional[str] = None
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+# Library default: stay silent unless the application configures logging
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the current logging context onto each record, in the caller's task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id
+        record.category = _category.get()
+        record.year = _year.get()
+        record.phase = _phase.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "category": getattr(record, "category", None),
+            "year": getattr(record, "year", None),
+            "phase": getattr(record, "phase", None),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _PreformattedQueueHandler(QueueHandler):
+    """Queue handler that leaves JSON formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback in the caller, since arguments may
+        # change and tracebacks cannot cross the queue
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger under the library's logger hierarchy.
+
+    Args:
+        name (str): The module name, usually `__name__`.
+
+    Returns:
+        logging.Logger: The logger.
+    """
+    if name != LOGGER_NAME and not name.startswith(f"{LOGGER_NAME}."):
+        name = f"{LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
+
+
+def configure_logging(level: Union[int, str] = "INFO", run_id: Optional[str] = None,
+                      stream: Optional[TextIO] = None) -> str:
+    """
+    Installs the queue-backed JSON lines logger.
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        level (Union[int, str]): The minimum level to emit (e.g., "DEBUG").
+        run_id (Optional[str]): The run id to attach to every line; generated when None.
+        stream (Optional[TextIO]): Where to write the lines; stdout by default.
+
+    Returns:
+        str: The run id in use.
+    """
+    global _run_id, _listener, _queue_handler
+    shutdown_logging()
+
+    _run_id = run_id or uuid.uuid4().hex[:12]
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    _queue_handler = _PreformattedQueueHandler(log_queue)
+    _queue_handler.addFilter(_ContextFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    return _run_id
+
+
+def shutdown_logging():
+    """Flushes pending log lines and stops the background writer."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def get_run_id() -> Optional[str]:
+    """Returns the run id attached to log lines, if logging is configured."""
+    return _run_id
+
+
+@contextmanager
+def log_context(category: Optional[str] = None, year: Optional[str] = None, phase: Optional[str] = None):
+    """
+    Sets the category, year and phase attached to log lines within the block.
+
+    Only the given fields are changed; the others keep their current values.
+    Context variables are copied into asyncio tasks, so concurrent downloads
+    each log with their own context.
+    """
+    tokens = []
+    for var, value in ((_category, category), (_year, year), (_phase, phase)):
+        if value is not None:
+            tokens.append((var, var.set(value)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
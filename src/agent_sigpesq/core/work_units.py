@@ -0,0 +1,302 @@
+"""
+Module for work units and sharding.
+
+A work unit is the smallest piece of work the agent can perform on its own:
+one report generation on the Sigpesq portal (e.g. Research Groups, or the
+Advisorships report for a single year). Exposing the work as an explicit list
+of units allows one run to be split deterministically across several
+processes or machines.
+"""
+
+import glob
+import io
+import json
+import os
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set, TypeVar
+
+T = TypeVar('T')
+
+SUMMARY_DIRNAME = "_summary"
+SUMMARY_FILENAME = "summary.json"
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """
+    A single report generation on the Sigpesq portal.
+
+    Attributes:
+        category (str): The report category name (e.g., "Advisorships").
+        year (Optional[str]): The report year, for categories split by year.
+    """
+    category: str
+    year: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Returns a stable identifier for the unit (e.g., "Advisorships/2024")."""
+        if self.year is None:
+            return self.category
+        return f"{self.category}/{self.year}"
+
+
+DELIVERY_DISK = "disk"
+DELIVERY_MEMORY = "memory"
+DELIVERY_MODES = (DELIVERY_DISK, DELIVERY_MEMORY)
+
+
+@dataclass
+class DownloadedReport:
+    """
+    A report downloaded by a strategy.
+
+    Depending on the delivery mode, the report is either saved under the
+    reports tree (`path`) or handed over in memory (`content`).
+
+    Attributes:
+        filename (str): The filename suggested by the portal.
+        path (Optional[str]): The path of the saved report, in "disk" delivery.
+        content (Optional[io.BytesIO]): The report content, in "memory" delivery.
+    """
+    filename: str
+    path: Optional[str] = None
+    content: Optional[io.BytesIO] = field(default=None, repr=False)
+
+
+@dataclass
+class UnitResult:
+    """
+    The outcome of running a single work unit, as yielded by
+    `SigpesqReportService.stream_reports` and recorded in the run summary.
+
+    Attributes:
+        category (str): The report category name.
+        year (Optional[str]): The report year, if any.
+        status (str): One of "success", "failed" or "skipped" (not attempted,
+            e.g. because the circuit breaker was open; eligible for resume).
+        shard (Optional[str]): The shard that ran the unit (e.g., "1/4").
+        path (Optional[str]): The path of the saved report, in "disk" delivery;
+            None when the delta stage removed it after recording it.
+        filename (Optional[str]): The filename suggested by the portal.
+        content (Optional[io.BytesIO]): The report content, in "memory" delivery;
+            never written to the run summary.
+        size (Optional[int]): The size of the saved report in bytes.
+        sha256 (Optional[str]): The SHA-256 hex digest of the saved report.
+        started_at (Optional[str]): When the unit started (ISO 8601, UTC).
+        duration_seconds (Optional[float]): How long the unit took, including the download.
+    """
+    category: str
+    year: Optional[str] = None
+    status: str = "failed"
+    shard: Optional[str] = None
+    path: Optional[str] = None
+    filename: Optional[str] = None
+    content: Optional[io.BytesIO] = field(default=None, repr=False, compare=False)
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    started_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        """Returns the key of the unit this result belongs to."""
+        return WorkUnit(self.category, self.year).key
+
+    @property
+    def success(self) -> bool:
+        """Whether the unit completed successfully."""
+        return self.status == "success"
+
+    def to_dict(self) -> Dict:
+        """Returns the result as a JSON-serialisable dictionary, without the content."""
+        data = asdict(replace(self, content=None))
+        del data["content"]
+        return data
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    Deterministic selection of a subset of work units.
+
+    Units are assigned round-robin over their enumeration order, so every
+    process that enumerates the same units agrees on the assignment.
+
+    Attributes:
+        index (int): The 1-based shard index.
+        count (int): The total number of shards.
+    """
+    index: int = 1
+    count: int = 1
+
+    def __post_init__(self):
+        if self.count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {self.count}.")
+        if not 1 <= self.index <= self.count:
+            raise ValueError(f"Shard index must be between 1 and {self.count}, got {self.index}.")
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """
+        Parses a shard specification in the form "i/n" (e.g., "2/4").
+
+        Args:
+            spec (str): The shard specification.
+
+        Returns:
+            Shard: The parsed shard.
+
+        Raises:
+            ValueError: If the specification is malformed or out of range.
+        """
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{spec}', expected the form i/n (e.g., 1/4).")
+        return cls(index=index, count=count)
+
+    def select(self, units: Sequence[T]) -> List[T]:
+        """
+        Returns the units assigned to this shard.
+
+        Args:
+            units (Sequence[T]): All units, in enumeration order.
+
+        Returns:
+            List[T]: The subset of units belonging to this shard.
+        """
+        return [unit for position, unit in enumerate(units) if position % self.count == self.index - 1]
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def parse_years(spec: str, today: Optional[date] = None) -> Set[str]:
+    """
+    Parses a year selection such as "2024-2025", "current" or "2019,2022-current".
+
+    The selection is a comma-separated list of years or inclusive ranges,
+    where "current" and "previous" stand for the current and previous year.
+
+    Args:
+        spec (str): The year selection.
+        today (Optional[date]): The reference date for "current"; today when None.
+
+    Returns:
+        Set[str]: The selected years.
+
+    Raises:
+        ValueError: If the selection is malformed or empty.
+    """
+    current = (today or date.today()).year
+    keywords = {"current": current, "previous": current - 1}
+
+    def to_year(token: str) -> int:
+        token = token.strip().lower()
+        if token in keywords:
+            return keywords[token]
+        if len(token) == 4 and token.isdigit():
+            return int(token)
+        raise ValueError(f"Invalid year '{token}' in '{spec}', expected YYYY, 'current' or 'previous'.")
+
+    years: Set[int] = set()
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        if "-" in part:
+            start, end = (to_year(token) for token in part.split("-", 1))
+            if start > end:
+                raise ValueError(f"Invalid year range '{part.strip()}': start is after end.")
+            years.update(range(start, end + 1))
+        else:
+            years.add(to_year(part))
+
+    if not years:
+        raise ValueError(f"Empty year selection '{spec}'.")
+    return {str(year) for year in years}
+
+
+def write_shard_summary(download_dir: str, shard: Shard, results: List[UnitResult]) -> str:
+    """
+    Writes the results of one shard to the reports tree.
+
+    Args:
+        download_dir (str): The root reports directory.
+        shard (Shard): The shard that produced the results.
+        results (List[UnitResult]): The per-unit results.
+
+    Returns:
+        str: The path of the written shard summary.
+    """
+    summary_dir = os.path.join(download_dir, SUMMARY_DIRNAME)
+    os.makedirs(summary_dir, exist_ok=True)
+    path = os.path.join(summary_dir, f"shard-{shard.index}-of-{shard.count}.json")
+    _write_json(path, {"shard": str(shard), "units": [r.to_dict() for r in results]})
+    return path
+
+
+def merge_shard_summaries(download_dir: str) -> Dict:
+    """
+    Merges every shard summary found in the reports tree into `summary.json`.
+
+    Shard summaries may come from local processes or from other machines
+    sharing the same reports tree, so this can be called after each shard.
+
+    Args:
+        download_dir (str): The root reports directory.
+
+    Returns:
+        Dict: The combined summary.
+    """
+    units: List[Dict] = []
+    shards: List[str] = []
+    pattern = os.path.join(download_dir, SUMMARY_DIRNAME, "shard-*-of-*.json")
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        shards.append(data["shard"])
+        units.extend(data["units"])
+
+    summary = {
+        "shards": shards,
+        "total": len(units),
+        "succeeded": sum(1 for u in units if u["status"] == "success"),
+        "failed": sum(1 for u in units if u["status"] == "failed"),
+        "skipped": sum(1 for u in units if u["status"] == "skipped"),
+        "units": units,
+    }
+    os.makedirs(download_dir, exist_ok=True)
+    _write_json(os.path.join(download_dir, SUMMARY_FILENAME), summary)
+    return summary
+
+
+def load_pending_units(download_dir: str) -> Set[str]:
+    """
+    Returns the keys of the units that did not succeed in the last run.
+
+    Args:
+        download_dir (str): The root reports directory.
+
+    Returns:
+        Set[str]: The keys (e.g., "Advisorships/2024") of failed and skipped units.
+
+    Raises:
+        FileNotFoundError: If no summary exists yet.
+    """
+    with open(os.path.join(download_dir, SUMMARY_FILENAME), encoding="utf-8") as f:
+        summary = json.load(f)
+    return {
+        WorkUnit(u["category"], u["year"]).key
+        for u in summary["units"]
+        if u["status"] != "success"
+    }
+
+
+def _write_json(path: str, data: Dict):
+    """Writes JSON atomically, as several processes may share the reports tree."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
@@ -2,8 +2,11 @@
 Services module for Agent Sigpesq.
 
 Contains the main service implementations that orchestrate business logic, 
-such as the `SigpesqReportService`.
+such as the `SigpesqReportService`, the `LocalShardExecutor` and the
+`ReportDeltaStage`.
 """
-from .reports_service import SigpesqReportService
+from .reports_service import SigpesqLoginError, SigpesqReportService
+from .sharded_executor import LocalShardExecutor
+from .delta_stage import ReportDeltaStage
 
-__all__ = ["SigpesqReportService"]
+__all__ = ["SigpesqReportService", "SigpesqLoginError", "LocalShardExecutor", "ReportDeltaStage"]
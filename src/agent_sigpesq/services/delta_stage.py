@@ -0,0 +1,334 @@
+"""
+Module for storing deltas between consecutive report snapshots.
+
+Sigpesq reports are full dumps, so consecutive downloads of the same
+(category, year) report are nearly identical. The `ReportDeltaStage` compares
+each new download with the previous version of the same report and stores only
+the inserted, updated and deleted rows, writing a full snapshot periodically so
+that the chain of deltas to replay stays short.
+
+Layout of the store, under `<download_dir>/_deltas/<category>/<year>/`:
+
+    manifest.json               # ordered list of versions
+    v000001-snapshot.json.gz    # every row of the report
+    v000002-delta.json.gz       # inserted, updated and deleted rows only
+
+Rows are stored column-wise (one list of values per column) and gzip
+compressed. Each row is identified by the values of its configured key
+columns, or by the whole row when no key columns are configured.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date, datetime, time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from agent_sigpesq.core.structured_logging import get_logger
+from agent_sigpesq.core.work_units import WorkUnit
+
+logger = get_logger(__name__)
+
+DELTAS_DIRNAME = "_deltas"
+MANIFEST_FILENAME = "manifest.json"
+
+# Row identity -> row values, in report order
+Rows = Dict[str, List[str]]
+
+
+def _cell(value) -> str:
+    """Normalises a spreadsheet cell to a string, so versions compare exactly."""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_report(path: str, content: Optional[BinaryIO] = None) -> Tuple[List[str], List[List[str]]]:
+    """
+    Reads a downloaded report into a header and a list of rows.
+
+    Supports `.csv` natively and `.xlsx` through the optional `openpyxl`
+    dependency (`pip install agent_sigpesq[deltas]`).
+
+    Args:
+        path (str): The path (or, with `content`, just the filename) of the report.
+        content (Optional[BinaryIO]): The report content, for reports delivered
+            in memory; it is rewound after reading.
+
+    Returns:
+        Tuple[List[str], List[List[str]]]: The column names and the rows.
+
+    Raises:
+        ValueError: If the report format is not supported.
+        ImportError: If `openpyxl` is required but not installed.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        if content is not None:
+            text = io.TextIOWrapper(content, encoding="utf-8-sig", newline="")
+            try:
+                raw_rows = [list(row) for row in csv.reader(text)]
+            finally:
+                # Leave the caller's buffer open and rewound
+                text.detach()
+                content.seek(0)
+        else:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                raw_rows = [list(row) for row in csv.reader(f)]
+    elif extension in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError(
+                "Reading .xlsx reports requires openpyxl: pip install agent_sigpesq[deltas]"
+            )
+        workbook = load_workbook(content if content is not None else path, read_only=True, data_only=True)
+        try:
+            raw_rows = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+        finally:
+            workbook.close()
+            if content is not None:
+                content.seek(0)
+    else:
+        raise ValueError(f"Unsupported report format '{extension}' for {path}.")
+
+    rows = [[_cell(value) for value in row] for row in raw_rows]
+    rows = [row for row in rows if any(row)]
+    if not rows:
+        return [], []
+
+    columns = rows[0]
+    width = len(columns)
+    # Pad or trim so every row lines up with the header
+    data = [(row + [""] * width)[:width] for row in rows[1:]]
+    return columns, data
+
+
+def _columnar(columns: List[str], keys: List[str], rows: Rows) -> Dict:
+    """Encodes the given rows column-wise."""
+    return {
+        "keys": keys,
+        "values": {column: [rows[key][i] for key in keys] for i, column in enumerate(columns)},
+    }
+
+
+def _from_columnar(columns: List[str], block: Dict) -> Rows:
+    """Decodes a column-wise block back into rows."""
+    values = [block["values"][column] for column in columns]
+    return {key: [column[i] for column in values] for i, key in enumerate(block["keys"])}
+
+
+def _write_gzip_json(path: str, data: Dict):
+    """Writes compressed JSON atomically."""
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _read_gzip_json(path: str) -> Dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReportDeltaStage:
+    """
+    Stores the changes between consecutive downloads of each report.
+
+    Attributes:
+        download_dir (str): The root reports directory.
+        key_columns (Dict[str, List[str]]): Row identity columns per category
+            name; categories not listed use the whole row as identity.
+        snapshot_every (int): Number of deltas written before a new full snapshot.
+        keep_snapshots (int): Number of snapshot chains kept; older versions are removed.
+        keep_downloads (bool): Whether to keep the downloaded file once recorded.
+    """
+
+    def __init__(self, download_dir: str = "reports", key_columns: Optional[Dict[str, List[str]]] = None,
+                 snapshot_every: int = 7, keep_snapshots: int = 2, keep_downloads: bool = True):
+        """
+        Initializes the ReportDeltaStage.
+        """
+        if snapshot_every < 1:
+            raise ValueError(f"snapshot_every must be at least 1, got {snapshot_every}.")
+        if keep_snapshots < 1:
+            raise ValueError(f"keep_snapshots must be at least 1, got {keep_snapshots}.")
+        self.download_dir = download_dir
+        self.key_columns = key_columns or {}
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots
+        self.keep_downloads = keep_downloads
+
+    def unit_dir(self, unit: WorkUnit) -> str:
+        """Returns the store directory of a (category, year) report."""
+        category = unit.category.lower().replace(" ", "_")
+        return os.path.join(self.download_dir, DELTAS_DIRNAME, category, unit.year or "all")
+
+    def process(self, unit: WorkUnit, path: str, content: Optional[BinaryIO] = None) -> Dict:
+        """
+        Records a new download of the unit's report as a delta or snapshot.
+
+        Args:
+            unit (WorkUnit): The unit the report belongs to.
+            path (str): The path of the downloaded report, or its filename when
+                `content` is given.
+            content (Optional[BinaryIO]): The report content, for reports
+                delivered in memory.
+
+        Returns:
+            Dict: The manifest entry of the new version.
+        """
+        columns, data = read_report(path, content)
+        key_columns = self.key_columns.get(unit.category, [])
+        rows = self._index(columns, data, key_columns)
+
+        store_dir = self.unit_dir(unit)
+        os.makedirs(store_dir, exist_ok=True)
+        manifest = self._read_manifest(store_dir, unit)
+        versions = manifest["versions"]
+        version = versions[-1]["version"] + 1 if versions else 1
+
+        previous_columns, previous_rows = self._replay(store_dir, manifest)
+        deltas_since_snapshot = 0
+        for entry in reversed(versions):
+            if entry["kind"] == "snapshot":
+                break
+            deltas_since_snapshot += 1
+
+        entry = {"version": version, "source": os.path.basename(path), "rows": len(rows)}
+        if (
+            not versions
+            or previous_columns != columns
+            or manifest.get("key_columns") != key_columns
+            or deltas_since_snapshot + 1 > self.snapshot_every
+        ):
+            entry["kind"] = "snapshot"
+            entry["file"] = f"v{version:06d}-snapshot.json.gz"
+            _write_gzip_json(os.path.join(store_dir, entry["file"]), {
+                "kind": "snapshot",
+                "version": version,
+                "columns": columns,
+                "key_columns": key_columns,
+                "rows": _columnar(columns, list(rows), rows),
+            })
+        else:
+            inserted = [key for key in rows if key not in previous_rows]
+            updated = [key for key in rows if key in previous_rows and previous_rows[key] != rows[key]]
+            deleted = [key for key in previous_rows if key not in rows]
+            entry.update({
+                "kind": "delta",
+                "file": f"v{version:06d}-delta.json.gz",
+                "inserted": len(inserted),
+                "updated": len(updated),
+                "deleted": len(deleted),
+            })
+            _write_gzip_json(os.path.join(store_dir, entry["file"]), {
+                "kind": "delta",
+                "version": version,
+                "columns": columns,
+                "key_columns": key_columns,
+                "inserted": _columnar(columns, inserted, rows),
+                "updated": _columnar(columns, updated, rows),
+                "deleted": deleted,
+            })
+
+        versions.append(entry)
+        manifest["key_columns"] = key_columns
+        self._compact(store_dir, manifest)
+        self._write_manifest(store_dir, manifest)
+
+        logger.info(f"Recorded {entry['kind']} v{version} for {unit.key} in {store_dir}.")
+        if not self.keep_downloads and content is None:
+            os.remove(path)
+        return entry
+
+    def load(self, unit: WorkUnit) -> Tuple[List[str], Rows]:
+        """
+        Reconstructs the latest version of the unit's report from the store.
+
+        Args:
+            unit (WorkUnit): The unit whose report to reconstruct.
+
+        Returns:
+            Tuple[List[str], Rows]: The column names and the rows by identity.
+        """
+        store_dir = self.unit_dir(unit)
+        return self._replay(store_dir, self._read_manifest(store_dir, unit))
+
+    @staticmethod
+    def _index(columns: List[str], data: List[List[str]], key_columns: List[str]) -> Rows:
+        """Keys every row by its identity, disambiguating duplicates by occurrence."""
+        missing = [column for column in key_columns if column not in columns]
+        if missing:
+            raise ValueError(f"Key columns {missing} not found in report columns {columns}.")
+        positions = [columns.index(column) for column in key_columns]
+
+        rows: Rows = {}
+        for row in data:
+            identity = [row[i] for i in positions] if positions else row
+            base_key = json.dumps(identity, ensure_ascii=False)
+            key = base_key
+            occurrence = 1
+            while key in rows:
+                key = f"{base_key}#{occurrence}"
+                occurrence += 1
+            rows[key] = row
+        return rows
+
+    @staticmethod
+    def _replay(store_dir: str, manifest: Dict) -> Tuple[List[str], Rows]:
+        """Applies the deltas recorded since the last snapshot."""
+        versions = manifest["versions"]
+        start = None
+        for i in range(len(versions) - 1, -1, -1):
+            if versions[i]["kind"] == "snapshot":
+                start = i
+                break
+        if start is None:
+            return [], {}
+
+        snapshot = _read_gzip_json(os.path.join(store_dir, versions[start]["file"]))
+        columns = snapshot["columns"]
+        rows = _from_columnar(columns, snapshot["rows"])
+        for entry in versions[start + 1:]:
+            delta = _read_gzip_json(os.path.join(store_dir, entry["file"]))
+            for key in delta["deleted"]:
+                rows.pop(key, None)
+            rows.update(_from_columnar(columns, delta["updated"]))
+            rows.update(_from_columnar(columns, delta["inserted"]))
+        return columns, rows
+
+    def _compact(self, store_dir: str, manifest: Dict):
+        """Removes versions older than the oldest retained snapshot."""
+        versions = manifest["versions"]
+        snapshot_indexes = [i for i, entry in enumerate(versions) if entry["kind"] == "snapshot"]
+        if len(snapshot_indexes) <= self.keep_snapshots:
+            return
+        first_kept = snapshot_indexes[-self.keep_snapshots]
+        for entry in versions[:first_kept]:
+            file_path = os.path.join(store_dir, entry["file"])
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        manifest["versions"] = versions[first_kept:]
+
+    @staticmethod
+    def _read_manifest(store_dir: str, unit: WorkUnit) -> Dict:
+        path = os.path.join(store_dir, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            return {"category": unit.category, "year": unit.year, "key_columns": [], "versions": []}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_manifest(store_dir: str, manifest: Dict):
+        path = os.path.join(store_dir, MANIFEST_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
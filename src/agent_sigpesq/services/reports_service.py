@@ -1,17 +1,45 @@
 import os
+import time
+import shutil
+import io
 import asyncio
-from typing import List, Optional
-from playwright.async_api import async_playwright
+import functools
+import contextvars
+import hashlib
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import AsyncIterator, Collection, List, Optional, Tuple
+from playwright.async_api import Page, async_playwright
 from dotenv import load_dotenv
 
 from agent_sigpesq.core.browser_factory import BrowserFactory
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.concurrency import ConcurrencyController
+from agent_sigpesq.core.structured_logging import get_logger, log_context
+from agent_sigpesq.core.work_units import (
+    DELIVERY_DISK,
+    DELIVERY_MODES,
+    SUMMARY_DIRNAME,
+    DownloadedReport,
+    Shard,
+    UnitResult,
+    WorkUnit,
+    merge_shard_summaries,
+    write_shard_summary,
+)
+from agent_sigpesq.services.delta_stage import ReportDeltaStage
 from agent_sigpesq.strategies.report_download_strategy import ReportDownloadStrategy
 from agent_sigpesq.strategies.research_groups_strategy import ResearchGroupsDownloadStrategy
 from agent_sigpesq.strategies.projects_strategy import ProjectsDownloadStrategy
 from agent_sigpesq.strategies.advisorships_strategy import AdvisorshipsDownloadStrategy
 
+logger = get_logger(__name__)
+
 load_dotenv()
 
+class SigpesqLoginError(Exception):
+    """Raised when the agent cannot log in to the Sigpesq portal."""
+
 class SigpesqReportService:
     """
     Service responsible for orchestrating the download of Sigpesq reports.
@@ -19,18 +47,53 @@ class SigpesqReportService:
     Attributes:
         headless (bool): Whether to run the browser in headless mode.
         download_dir (str): Directory where reports will be saved.
+        shard (Optional[Shard]): Subset of work units to run; all units when None.
+        delta_stage (Optional[ReportDeltaStage]): Records each download as a delta, when set.
+        circuit_breaker (CircuitBreaker): Breaker shared with all strategies.
+        only_units (Optional[Collection[str]]): Keys of the units to run (e.g., to
+            resume skipped units); all units when None.
+        categories (Optional[Collection[str]]): Keys of the categories to download
+            (e.g., "groups", "projects", "advisorships"); all when None.
+        years (Optional[Collection[str]]): Years to download for categories split
+            by year; all available years when None.
+        delivery (str): "disk" to save reports under `download_dir`, or "memory"
+            to hand them over as in-memory buffers without writing them to disk.
+        profile_dir (Optional[str]): Persistent browser profile directory, so the
+            portal's static assets stay cached across runs; ephemeral when None.
+        cache_size_mb (int): HTTP cache size cap of the persistent profile, in MiB.
+        concurrency (Optional[ConcurrencyController]): Downloads units on several
+            pages at once, auto-tuning the worker count; one at a time when None.
+        results (List[UnitResult]): Per-unit results of the last run, without report content.
     """
     
-    def __init__(self, headless: bool = True, download_dir: str = "reports", strategies: Optional[List[ReportDownloadStrategy]] = None):
+    def __init__(self, headless: bool = True, download_dir: str = "reports", strategies: Optional[List[ReportDownloadStrategy]] = None, shard: Optional[Shard] = None, delta_stage: Optional[ReportDeltaStage] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, only_units: Optional[Collection[str]] = None,
+                 categories: Optional[Collection[str]] = None, years: Optional[Collection[str]] = None,
+                 delivery: str = DELIVERY_DISK, profile_dir: Optional[str] = None, cache_size_mb: int = 100,
+                 concurrency: Optional[ConcurrencyController] = None):
         """
         Initializes the SigpesqReportService.
         """
+        if delivery not in DELIVERY_MODES:
+            raise ValueError(f"Unknown delivery mode '{delivery}'; available: {list(DELIVERY_MODES)}.")
         self.username = os.getenv("SIGPESQ_USER")
         self.password = os.getenv("SIGPESQ_PASSWORD")
         self.login_url = "https://sigpesq.ifes.edu.br/Login.aspx"
         self.reports_url = "https://sigpesq.ifes.edu.br/web/relatorio/lista.aspx"
         self.headless = headless
         self.download_dir = download_dir
+        self.shard = shard
+        self.delta_stage = delta_stage
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.only_units = set(only_units) if only_units is not None else None
+        self.delivery = delivery
+        self.profile_dir = profile_dir
+        self.cache_size_mb = cache_size_mb
+        self.concurrency = concurrency
+        self.results: List[UnitResult] = []
+        self._failed_strategies: List[ReportDownloadStrategy] = []
+        self._probe_exhausted = False
+        self._probe_lock: Optional[asyncio.Lock] = None
         
         # Initialize strategies in the order requested by user
         if strategies:
@@ -42,30 +105,77 @@ class SigpesqReportService:
                 AdvisorshipsDownloadStrategy()
             ]
 
+        if categories is not None:
+            available = {strategy.get_category_key() for strategy in self.strategies}
+            unknown = sorted(set(categories) - available)
+            if unknown:
+                raise ValueError(f"Unknown categories {unknown}; available: {sorted(available)}.")
+            self.strategies = [s for s in self.strategies if s.get_category_key() in categories]
+
+        for strategy in self.strategies:
+            strategy.circuit_breaker = self.circuit_breaker
+            strategy.delivery = delivery
+            if years is not None:
+                strategy.years = set(years)
+
     async def run(self) -> bool:
         """
         Runs the report download process.
+
+        Returns:
+            bool: True if every selected category was downloaded, False otherwise.
         """
-        print(f"Initializing Browser (Headless: {self.headless})...")
+        try:
+            async for _ in self.stream_reports():
+                pass
+        except SigpesqLoginError:
+            logger.error("Login failed. Aborting.")
+            return False
+        except Exception as e:
+            logger.exception(f"An unexpected error occurred: {e}")
+            return False
+
+        return self._evaluate_results()
+
+    async def stream_reports(self) -> AsyncIterator[UnitResult]:
+        """
+        Downloads the selected work units, yielding each result as soon as its
+        unit finishes.
+
+        Usage:
+            async for report in service.stream_reports():
+                if report.success:
+                    process(report.path)
+
+        With `delivery="memory"`, `report.content` holds the report as a
+        `BytesIO` instead, and nothing is written under `download_dir`.
+
+        Yields:
+            UnitResult: The result of each unit, with its path (or content),
+            size, hash and timings.
+
+        Raises:
+            SigpesqLoginError: If the login fails.
+        """
+        logger.info(f"Initializing Browser (Headless: {self.headless})...")
         
         async with async_playwright() as p:
-            context = await BrowserFactory.create_browser_context(p, headless=self.headless)
-            page = await context.new_page()
+            context = await BrowserFactory.create_browser_context(
+                p, headless=self.headless, profile_dir=self.profile_dir, cache_size_mb=self.cache_size_mb
+            )
             
             try:
+                page = await context.new_page()
+
                 # Login
-                if not await self._login(page):
-                    print("Login failed. Aborting.")
-                    return False
+                with log_context(phase="login"):
+                    logged_in = await self._login(page)
+                if not logged_in:
+                    raise SigpesqLoginError("Login to the Sigpesq portal failed.")
                 
                 # Download Reports
-                return await self._download_all_reports(page)
-                
-            except Exception as e:
-                print(f"An unexpected error occurred: {e}")
-                import traceback
-                traceback.print_exc()
-                return False
+                async for result in self._iter_units(page):
+                    yield result
             finally:
                 await context.close()
 
@@ -73,14 +183,14 @@ class SigpesqReportService:
         """
         Performs login on the Sigpesq portal.
         """
-        print(f"Navigating to {self.login_url}...")
+        logger.info(f"Navigating to {self.login_url}...")
         await page.goto(self.login_url)
         
         if not self.username or not self.password:
-            print("Error: SIGPESQ_USER or SIGPESQ_PASSWORD not set.")
+            logger.error("SIGPESQ_USER or SIGPESQ_PASSWORD not set.")
             return False
             
-        print("Entering credentials...")
+        logger.info("Entering credentials...")
         try:
              # Wait for input to be ready
             await page.wait_for_selector("#txtLogin", state="visible")
@@ -88,7 +198,7 @@ class SigpesqReportService:
             await page.fill("#txtLogin", self.username)
             await page.fill("#txtSenha", self.password)
             
-            print("Clicking login...")
+            logger.info("Clicking login...")
             await page.click("#btnLogin")
             
             # Wait for navigation or check for success/failure
@@ -98,45 +208,340 @@ class SigpesqReportService:
             try:
                  # Check for success (URL change)
                 await page.wait_for_url("**/web/**", timeout=10000)
-                print("Login successful!")
+                logger.info("Login successful!")
                 return True
             except:
                 # Check for error message
                 if await page.is_visible("#ContentPlaceHolder_lblMsgErro"):
                     msg = await page.text_content("#ContentPlaceHolder_lblMsgErro")
-                    print(f"Login failed: {msg}")
+                    logger.error(f"Login failed: {msg}")
                     return False
                 
                 # If URL didn't change and no error message, assumption: login failed or timed out
                 # But sometimes it redirects to a different path
                 current_url = page.url
                 if "Login.aspx" not in current_url:
-                     print("Login successful (URL changed)!")
+                     logger.info("Login successful (URL changed)!")
                      return True
                 
-                print("Login failed: Unknown error.")
+                logger.error("Login failed: Unknown error.")
                 return False
 
         except Exception as e:
-            print(f"Error during login: {e}")
+            logger.error(f"Error during login: {e}")
             return False
 
     async def _download_all_reports(self, page) -> bool:
         """
-        Iterates through configured strategies and downloads reports.
+        Downloads every selected unit on an authenticated page.
         """
-        print(f"Navigating to reports page: {self.reports_url}...")
-        await page.goto(self.reports_url)
+        async for _ in self._iter_units(page):
+            pass
+        return self._evaluate_results()
+
+    async def _iter_units(self, page) -> AsyncIterator[UnitResult]:
+        """
+        Enumerates the work units of the configured strategies, selects this
+        service's shard, and downloads each selected unit, yielding its result.
+        """
+        with log_context(phase="enumerate"):
+            logger.info(f"Navigating to reports page: {self.reports_url}...")
+            navigation_started = time.perf_counter()
+            await page.goto(self.reports_url)
+            navigation_seconds = time.perf_counter() - navigation_started
+            units, self._failed_strategies = await self._list_units(page)
         
-        all_success = True
+        if self.only_units is not None:
+            units = [(strategy, unit) for strategy, unit in units if unit.key in self.only_units]
+        shard = self.shard or Shard()
+        selected = shard.select(units)
+        logger.info(f"Shard {shard}: running {len(selected)} of {len(units)} work units.")
         
+        self.results = []
+        self._probe_exhausted = False
+        self._probe_lock = asyncio.Lock()
+        if self.concurrency is not None:
+            results = self._run_concurrently(page, selected, shard, navigation_seconds)
+        else:
+            results = self._run_sequentially(page, selected, shard)
+        async for result in results:
+            # The caller owns the report content; keeping it would hold every report in memory
+            self.results.append(replace(result, content=None))
+            yield result
+        
+        if self.delivery == DELIVERY_DISK:
+            self._write_summary(shard)
+
+    async def _run_sequentially(self, page, selected: List[Tuple[ReportDownloadStrategy, WorkUnit]],
+                                shard: Shard) -> AsyncIterator[UnitResult]:
+        """
+        Downloads the selected units one after another on a single page.
+        """
+        for strategy, unit in selected:
+            with log_context(category=unit.category, year=unit.year):
+                result = await self._run_unit(page, strategy, unit, shard)
+            yield result
+
+    async def _run_concurrently(self, page, selected: List[Tuple[ReportDownloadStrategy, WorkUnit]], shard: Shard,
+                                navigation_seconds: float) -> AsyncIterator[UnitResult]:
+        """
+        Downloads the selected units on several pages of the logged-in context,
+        as many at a time as the concurrency controller allows.
+
+        A cheap unit runs alone first as the preflight: together with the
+        reports page navigation, its latency calibrates the initial worker
+        count. Results are yielded in completion order.
+        """
+        if not selected:
+            return
+        pending = list(selected)
+
+        with log_context(phase="preflight"):
+            strategy, unit = pending.pop(self._pick_preflight(pending))
+            logger.info(f"Preflight with {unit.key}.")
+            with log_context(category=unit.category, year=unit.year):
+                _, result = await self._run_worker_unit(page, page, strategy, unit, shard)
+            report_seconds = result.duration_seconds if result.success else None
+            self.concurrency.calibrate(navigation_seconds, report_seconds, unit.category)
+        yield result
+
+        idle_pages = [page]
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < self.concurrency.limit:
+                    # New pages are opened inside the task, so their failures fail only that unit
+                    worker_page = idle_pages.pop() if idle_pages else None
+                    strategy, unit = pending.pop(0)
+                    with log_context(category=unit.category, year=unit.year):
+                        task = asyncio.create_task(self._run_worker_unit(page, worker_page, strategy, unit, shard))
+                    running[task] = time.monotonic()
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    started_at = running.pop(task)
+                    worker_page, result = task.result()
+                    if worker_page is not None:
+                        idle_pages.append(worker_page)
+                    if result.status != "skipped":
+                        self.concurrency.record(started_at, result.duration_seconds, result.success, result.category)
+                    yield result
+        finally:
+            # Only reached with tasks left if the consumer stopped early
+            for task in running:
+                task.cancel()
+
+    @staticmethod
+    def _pick_preflight(selected: List[Tuple[ReportDownloadStrategy, WorkUnit]]) -> int:
+        """
+        Returns the index of the unit to run as the preflight: the cheap unit
+        picked by the first strategy that has one, or else the first unit.
+        """
+        for strategy in dict.fromkeys(strategy for strategy, _ in selected):
+            units = [unit for s, unit in selected if s is strategy]
+            unit = strategy.pick_preflight_unit(units)
+            if unit in units:
+                return selected.index((strategy, unit))
+        return 0
+
+    async def _run_worker_unit(self, page, worker_page, strategy: ReportDownloadStrategy, unit: WorkUnit,
+                               shard: Shard) -> Tuple[Optional[Page], UnitResult]:
+        """
+        Runs a unit on a worker page, opening a new page when `worker_page` is None.
+
+        Errors never escape: a unit that raises becomes a failed result, so the
+        other units keep running and the run summary stays complete.
+
+        Returns:
+            Tuple: The worker page, or None if it could not be opened, and the result.
+        """
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        try:
+            if worker_page is None:
+                worker_page = await self._open_worker_page(page)
+            return worker_page, await self._run_unit(worker_page, strategy, unit, shard)
+        except Exception as e:
+            logger.error(f"Error running {unit.key}: {e}")
+            self.circuit_breaker.record_failure()
+            result = UnitResult(
+                category=unit.category,
+                year=unit.year,
+                shard=str(shard),
+                started_at=started_at,
+                duration_seconds=time.perf_counter() - started,
+            )
+            return worker_page, result
+
+    async def _open_worker_page(self, page):
+        """
+        Opens another page on the logged-in context, ready on the reports page.
+        """
+        worker_page = await page.context.new_page()
+        try:
+            await worker_page.goto(self.reports_url)
+        except Exception:
+            await worker_page.close()
+            raise
+        return worker_page
+
+    async def _run_unit(self, page, strategy: ReportDownloadStrategy, unit: WorkUnit, shard: Shard) -> UnitResult:
+        """
+        Downloads a single unit, unless the circuit breaker is open.
+        """
+        result = UnitResult(
+            category=unit.category,
+            year=unit.year,
+            shard=str(shard),
+            started_at=datetime.now(timezone.utc).isoformat(),
+        )
+        started = time.perf_counter()
+
+        with log_context(phase="download"):
+            # Concurrent units wait for a half-open trial's outcome instead of being skipped
+            if not await self.circuit_breaker.acquire():
+                async with self._probe_lock:
+                    # Units waiting here reuse the outcome of the probe that ran first
+                    if self.circuit_breaker.is_open and not self._probe_exhausted:
+                        with log_context(phase="probe"):
+                            self._probe_exhausted = not await self.circuit_breaker.probe(lambda: self._probe_portal(page))
+                if self._probe_exhausted or not await self.circuit_breaker.acquire():
+                    logger.warning(f"Skipping {unit.key}: circuit breaker is open.")
+                    result.status = "skipped"
+                    return result
+
+            logger.info(f"--- Starting Unit: {unit.key} ---")
+            try:
+                report = await strategy.download_unit(page, self.download_dir, unit)
+            except Exception as e:
+                logger.error(f"Error downloading {unit.key}: {e}")
+                report = None
+            # Counted here, since a degraded portal often fails before the download starts
+            if not report:
+                self.circuit_breaker.record_failure()
+                logger.warning(f"Unit {unit.key} failed.")
+                result.duration_seconds = time.perf_counter() - started
+                return result
+            self.circuit_breaker.record_success()
+
+        result.status = "success"
+        result.filename = report.filename
+        if report.content is not None:
+            result.content = report.content
+            result.size, result.sha256 = self._describe_buffer(report.content)
+        else:
+            result.path = report.path
+            # Hash before the delta stage, which may remove the download
+            result.size, result.sha256 = await asyncio.get_running_loop().run_in_executor(None, self._describe_file, report.path)
+        if self.delta_stage is not None:
+            with log_context(phase="delta"):
+                # Parsing and diffing a full report would block the other downloads
+                context = contextvars.copy_context()
+                recorded = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(context.run, self._record_delta, unit, report)
+                )
+            if recorded and result.path is not None and not self.delta_stage.keep_downloads:
+                # The delta stage removed the download; the report lives on in the delta store only
+                result.path = None
+        result.duration_seconds = time.perf_counter() - started
+        logger.info(f"Unit {unit.key} completed successfully in {result.duration_seconds:.1f}s.")
+        return result
+
+    @staticmethod
+    def _describe_file(path: str) -> Tuple[int, str]:
+        """Returns the size and SHA-256 hex digest of a file."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return os.path.getsize(path), digest.hexdigest()
+
+    @staticmethod
+    def _describe_buffer(content: io.BytesIO) -> Tuple[int, str]:
+        """Returns the size and SHA-256 hex digest of an in-memory report."""
+        data = content.getbuffer()
+        try:
+            return data.nbytes, hashlib.sha256(data).hexdigest()
+        finally:
+            # A live buffer view would keep the BytesIO from being resized
+            data.release()
+
+    def _evaluate_results(self) -> bool:
+        """
+        Decides whether the last run succeeded from its per-unit results.
+        """
+        # A category succeeds when at least one of its selected units succeeded
+        all_success = not self._failed_strategies
         for strategy in self.strategies:
-            print(f"--- Starting Strategy: {strategy.get_category_name()} ---")
-            success = await strategy.download(page, self.download_dir)
-            if success:
-                print(f"Strategy {strategy.get_category_name()} completed successfully.")
-            else:
-                print(f"Strategy {strategy.get_category_name()} failed.")
+            category = strategy.get_category_name()
+            category_results = [r for r in self.results if r.category == category and r.status != "skipped"]
+            if category_results and not any(r.success for r in category_results):
+                logger.warning(f"Strategy {category} failed.")
                 all_success = False
+        
+        skipped = sum(1 for r in self.results if r.status == "skipped")
+        if skipped:
+            logger.warning(f"{skipped} work units were skipped; rerun with --resume once the portal recovers.")
+            all_success = False
             
         return all_success
+
+    def _write_summary(self, shard: Shard):
+        """
+        Writes this run's shard summary and merges it into `summary.json`.
+        """
+        if self.shard is None:
+            # An unsharded run covers every unit, so earlier shard summaries are stale
+            shutil.rmtree(os.path.join(self.download_dir, SUMMARY_DIRNAME), ignore_errors=True)
+        write_shard_summary(self.download_dir, shard, self.results)
+        merge_shard_summaries(self.download_dir)
+
+    async def _probe_portal(self, page) -> bool:
+        """
+        Checks whether the portal responds, by reloading the reports page.
+        """
+        response = await page.goto(self.reports_url, timeout=15000)
+        return response is not None and response.ok and "Login.aspx" not in page.url
+
+    def _record_delta(self, unit: WorkUnit, report: DownloadedReport) -> bool:
+        """
+        Records the downloaded report in the delta store.
+
+        A failure here does not fail the unit: the full download is still
+        available on disk or in memory.
+
+        Returns:
+            bool: True if the report was recorded, False otherwise.
+        """
+        try:
+            if report.content is not None:
+                self.delta_stage.process(unit, report.filename, report.content)
+            else:
+                self.delta_stage.process(unit, report.path)
+        except Exception as e:
+            logger.error(f"Error recording delta for {unit.key}: {e}")
+            return False
+        return True
+
+    async def _list_units(self, page) -> Tuple[List[Tuple[ReportDownloadStrategy, WorkUnit]], List[ReportDownloadStrategy]]:
+        """
+        Enumerates the work units of every configured strategy, in order.
+
+        Returns:
+            Tuple: The (strategy, unit) pairs and the strategies that could not
+            enumerate any unit.
+        """
+        units = []
+        failed = []
+        for strategy in self.strategies:
+            try:
+                with log_context(category=strategy.get_category_name()):
+                    strategy_units = await strategy.list_units(page)
+            except Exception as e:
+                logger.error(f"Error listing units for {strategy.get_category_name()}: {e}")
+                strategy_units = []
+            if not strategy_units:
+                logger.warning(f"Strategy {strategy.get_category_name()} has no work units.")
+                failed.append(strategy)
+            units.extend((strategy, unit) for unit in strategy_units)
+        return units, failed
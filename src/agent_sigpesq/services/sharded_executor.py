@@ -0,0 +1,135 @@
+import os
+import shutil
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Collection, List, Optional
+
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.concurrency import ConcurrencyController
+from agent_sigpesq.core.structured_logging import configure_logging, get_logger, get_run_id, shutdown_logging
+from agent_sigpesq.core.work_units import SUMMARY_DIRNAME, Shard, merge_shard_summaries
+from agent_sigpesq.services.delta_stage import ReportDeltaStage
+from agent_sigpesq.services.reports_service import SigpesqReportService
+from agent_sigpesq.strategies.report_download_strategy import ReportDownloadStrategy
+
+logger = get_logger(__name__)
+
+
+def _run_shard(shard: Shard, headless: bool, download_dir: str, strategies: Optional[List[ReportDownloadStrategy]],
+               delta_stage: Optional[ReportDeltaStage], circuit_breaker: Optional[CircuitBreaker],
+               only_units: Optional[Collection[str]], categories: Optional[Collection[str]],
+               years: Optional[Collection[str]], profile_dir: Optional[str], cache_size_mb: int,
+               concurrency: Optional[ConcurrencyController], log_level: int, run_id: Optional[str]) -> bool:
+    """
+    Runs one shard in the current process, with its own browser.
+    """
+    # Spawned processes start without logging; log under the parent's run id
+    configure_logging(level=log_level, run_id=run_id)
+    service = SigpesqReportService(
+        headless=headless,
+        download_dir=download_dir,
+        strategies=strategies,
+        shard=shard,
+        delta_stage=delta_stage,
+        circuit_breaker=circuit_breaker,
+        only_units=only_units,
+        categories=categories,
+        years=years,
+        profile_dir=profile_dir,
+        cache_size_mb=cache_size_mb,
+        concurrency=concurrency,
+    )
+    try:
+        return asyncio.run(service.run())
+    finally:
+        shutdown_logging()
+
+
+class LocalShardExecutor:
+    """
+    Runs a download job split into shards across local processes.
+
+    Each process logs in with its own browser and downloads the work units of
+    its shard. All processes write into the same reports tree, and their shard
+    summaries are merged into a combined `summary.json` at the end.
+
+    Attributes:
+        workers (int): Number of processes (and shards).
+        headless (bool): Whether to run the browsers in headless mode.
+        download_dir (str): Directory where reports will be saved.
+        delta_stage (Optional[ReportDeltaStage]): Records each download as a delta, when set.
+        circuit_breaker (Optional[CircuitBreaker]): Breaker settings; each process
+            gets its own copy, shared by that process's service and strategies.
+        only_units (Optional[Collection[str]]): Keys of the units to run; all units when None.
+        categories (Optional[Collection[str]]): Keys of the categories to download; all when None.
+        years (Optional[Collection[str]]): Years to download for categories split by year.
+        profile_dir (Optional[str]): Persistent browser profile directory; each
+            process takes its own profile slot in it.
+        cache_size_mb (int): HTTP cache size cap per profile slot, in MiB.
+        concurrency (Optional[ConcurrencyController]): Concurrency bounds; each
+            process tunes its own copy against the portal.
+    """
+
+    def __init__(self, workers: int, headless: bool = True, download_dir: str = "reports", strategies: Optional[List[ReportDownloadStrategy]] = None,
+                 delta_stage: Optional[ReportDeltaStage] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 only_units: Optional[Collection[str]] = None, categories: Optional[Collection[str]] = None,
+                 years: Optional[Collection[str]] = None, profile_dir: Optional[str] = None, cache_size_mb: int = 100,
+                 concurrency: Optional[ConcurrencyController] = None):
+        """
+        Initializes the LocalShardExecutor.
+        """
+        if workers < 1:
+            raise ValueError(f"Number of workers must be at least 1, got {workers}.")
+        self.workers = workers
+        self.headless = headless
+        self.download_dir = download_dir
+        self.strategies = strategies
+        self.delta_stage = delta_stage
+        self.circuit_breaker = circuit_breaker
+        self.only_units = only_units
+        self.categories = categories
+        self.years = years
+        self.profile_dir = profile_dir
+        self.cache_size_mb = cache_size_mb
+        self.concurrency = concurrency
+
+    async def run(self) -> bool:
+        """
+        Runs every shard and merges their summaries.
+
+        Returns:
+            bool: True if every shard completed successfully, False otherwise.
+        """
+        # Drop summaries left by a previous run with a different shard count
+        shutil.rmtree(os.path.join(self.download_dir, SUMMARY_DIRNAME), ignore_errors=True)
+
+        logger.info(f"Starting {self.workers} worker processes...")
+        log_level = get_logger(__name__).getEffectiveLevel()
+        loop = asyncio.get_running_loop()
+        # Spawn fresh interpreters so no Playwright state is inherited via fork
+        context = multiprocessing.get_context("spawn")
+
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            futures = [
+                loop.run_in_executor(
+                    pool, _run_shard, Shard(index, self.workers), self.headless, self.download_dir, self.strategies, self.delta_stage,
+                    self.circuit_breaker, self.only_units, self.categories, self.years, self.profile_dir, self.cache_size_mb,
+                    self.concurrency, log_level, get_run_id()
+                )
+                for index in range(1, self.workers + 1)
+            ]
+            outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        all_success = True
+        for index, outcome in enumerate(outcomes, start=1):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Shard {index}/{self.workers} crashed: {outcome}")
+                all_success = False
+            elif not outcome:
+                logger.warning(f"Shard {index}/{self.workers} failed.")
+                all_success = False
+
+        summary = merge_shard_summaries(self.download_dir)
+        logger.info(f"Summary: {summary['succeeded']} of {summary['total']} work units succeeded.")
+        return all_success
@@ -1,90 +1,116 @@
 import os
 import asyncio
+from typing import Collection, List, Optional
 from playwright.async_api import Page
+from agent_sigpesq.core.structured_logging import get_logger
+from agent_sigpesq.core.work_units import DownloadedReport, WorkUnit
 from .report_download_strategy import BasePlaywrightStrategy
 
+logger = get_logger(__name__)
+
 class AdvisorshipsDownloadStrategy(BasePlaywrightStrategy):
     """
     Strategy for downloading reports related to Student Advisorships (Orientacoes),
     iterating through available years.
     """
 
+    year_select_id = "ContentPlaceHolder_ddlRelOrientacao_Ano"
+
+    def __init__(self, years: Optional[Collection[str]] = None):
+        """
+        Initializes the AdvisorshipsDownloadStrategy.
+
+        Args:
+            years (Optional[Collection[str]]): Years to download; all years in
+                the dropdown when None.
+        """
+        self.years = years
+
     def get_category_name(self) -> str:
         """Returns the category name 'Advisorships'."""
         return "Advisorships"
-        
+
+    def get_category_key(self) -> str:
+        """Returns the category key 'advisorships'."""
+        return "advisorships"
+
     def get_button_id(self) -> str:
         """Returns the button ID for Advisorships."""
         return "ContentPlaceHolder_btnRel_Orientacoes"
-        
-    async def download(self, page: Page, reports_dir: str) -> bool:
+
+    async def list_units(self, page: Page) -> List[WorkUnit]:
         """
-        Executes the download process for Advisorships.
+        Returns one work unit per selected year available in the year dropdown.
         """
-        print(f"Processing {self.get_category_name()}...")
-        
+        # 1. Ensure accordion is open
+        await self._ensure_accordion_open(page, self.get_button_id(), "Orientações")
+
+        # 2. Check if dropdown exists
+        if not await page.is_visible(f"#{self.year_select_id}"):
+            logger.warning(f"Year dropdown {self.year_select_id} not found.")
+            return []
+
+        # Get all options using evaluation
+        options = await page.eval_on_selector_all(
+            f"#{self.year_select_id} option",
+            "elements => elements.map(e => e.value)"
+        )
+
+        # Filter valid years (exclude empty valued or "Select" options)
+        years = [opt for opt in options if opt and opt.isdigit()]
+        years.sort() # Ensure order
+
+        logger.info(f"Found years: {years}")
+
+        # Only selected years become units, so the others are never generated
+        if self.years is not None:
+            missing = sorted(set(self.years) - set(years))
+            if missing:
+                logger.warning(f"Selected years not available in the dropdown: {missing}")
+            years = [year for year in years if year in self.years]
+            logger.info(f"Selected years: {years}")
+
+        return [WorkUnit(category=self.get_category_name(), year=year) for year in years]
+
+    def pick_preflight_unit(self, units: List[WorkUnit]) -> Optional[WorkUnit]:
+        """
+        Picks the latest year: the year in progress has the fewest
+        advisorships, so its report is the cheapest to generate.
+        """
+        return max(units, key=lambda unit: unit.year) if units else None
+
+    async def download_unit(self, page: Page, reports_dir: str, unit: WorkUnit) -> Optional[DownloadedReport]:
+        """
+        Executes the download of the Advisorships report for the unit's year.
+        """
+        year = unit.year
+        button_id = self.get_button_id()
+
         try:
-            button_id = self.get_button_id()
-            
-            # 1. Ensure accordion is open
+            logger.info(f"Processing Year: {year}")
+
+            # Units may run after other categories, so re-check the accordion
             await self._ensure_accordion_open(page, button_id, "Orientações")
-            
-            # 2. Get year dropdown
-            # 2. Get year dropdown
-            year_select_id = "ContentPlaceHolder_ddlRelOrientacao_Ano"
-            
-            # Check if dropdown exists
-            if not await page.is_visible(f"#{year_select_id}"):
-                print(f"Year dropdown {year_select_id} not found.")
-                return False
-
-            # Get all options using evaluation
-            options = await page.eval_on_selector_all(
-                f"#{year_select_id} option", 
-                "elements => elements.map(e => e.value)"
-            )
-            
-            # Filter valid years (exclude empty valued or "Select" options)
-            years = [opt for opt in options if opt and opt.isdigit()]
-            years.sort() # Ensure order
-            
-            print(f"Found years: {years}")
-            
-            success_count = 0
-            
-            for year in years:
-                try:
-                    print(f"Processing Year: {year}")
-                    
-                    # Select year
-                    await page.select_option(f"#{year_select_id}", value=year)
-                    
-                    # Need to wait for postback/loading masking if likely
-                    # Assuming standard ASP.NET behavior, might need a small wait or check for loading mask
-                    # await page.wait_for_timeout(1000) 
-                    
-                    # Prepare subdirectory
-                    year_subdir = os.path.join(reports_dir, "advisorships", year)
-                    
-                    print(f"Clicking button {button_id} for year {year}...")
-                    
-                    # Handle download
-                    selector = f"#{button_id}"
-                    if await self._handle_download_and_move(page, selector, reports_dir, year_subdir):
-                        success_count += 1
-                    else:
-                        print(f"Failed to download report for {year}")
-                        
-                except Exception as e:
-                    print(f"Error processing year {year}: {e}")
-                    
-            if success_count > 0:
-                print(f"Successfully downloaded {success_count} advisorship reports.")
-                return True
-            else:
-                print("No advisorship reports downloaded successfully.")
-                return False
-                
+
+            # Select year
+            await page.select_option(f"#{self.year_select_id}", value=year)
+
+            # Need to wait for postback/loading masking if likely
+            # Assuming standard ASP.NET behavior, might need a small wait or check for loading mask
+            # await page.wait_for_timeout(1000)
+
+            # Prepare subdirectory
+            year_subdir = os.path.join(reports_dir, "advisorships", year)
+
+            logger.info(f"Clicking button {button_id} for year {year}...")
+
+            # Handle download
+            selector = f"#{button_id}"
+            report = await self._handle_download_and_move(page, selector, reports_dir, year_subdir)
+            if not report:
+                logger.warning(f"Failed to download report for {year}")
+            return report
+
         except Exception as e:
-            print(f"Error downloading {self.get_category_name()}: {e}")
-            return False
+            logger.error(f"Error processing year {year}: {e}")
+            return None
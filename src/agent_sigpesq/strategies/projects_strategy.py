@@ -1,7 +1,12 @@
 import os
+from typing import Optional
 from playwright.async_api import Page
+from agent_sigpesq.core.structured_logging import get_logger
+from agent_sigpesq.core.work_units import DownloadedReport, WorkUnit
 from .report_download_strategy import BasePlaywrightStrategy
 
+logger = get_logger(__name__)
+
 class ProjectsDownloadStrategy(BasePlaywrightStrategy):
     """
     Strategy for downloading reports related to Research Projects.
@@ -11,16 +16,18 @@ class ProjectsDownloadStrategy(BasePlaywrightStrategy):
         """Returns the category name 'Research Projects'."""
         return "Research Projects"
         
+    def get_category_key(self) -> str:
+        """Returns the category key 'projects'."""
+        return "projects"
+        
     def get_button_id(self) -> str:
         """Returns the button ID for Research Projects."""
         return "ContentPlaceHolder_btnRel_Projetos"
         
-    async def download(self, page: Page, reports_dir: str) -> bool:
+    async def download_unit(self, page: Page, reports_dir: str, unit: WorkUnit) -> Optional[DownloadedReport]:
         """
-        Executes the download simulation for Research Projects.
+        Executes the download for the single Research Projects unit.
         """
-        print(f"Processing {self.get_category_name()}...")
-        
         try:
             # 1. Prepare target subdirectory
             reports_subdir = os.path.join(reports_dir, "research_projects")
@@ -35,5 +42,5 @@ class ProjectsDownloadStrategy(BasePlaywrightStrategy):
             return await self._handle_download_and_move(page, selector, reports_dir, reports_subdir)
             
         except Exception as e:
-            print(f"Error downloading {self.get_category_name()}: {e}")
-            return False
+            logger.error(f"Error downloading {self.get_category_name()}: {e}")
+            return None
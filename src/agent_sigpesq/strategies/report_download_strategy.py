@@ -6,17 +6,37 @@ report category strategies must implement.
 """
 
 from abc import ABC, abstractmethod
+import io
 import os
 import asyncio
+from typing import Collection, List, Optional
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.structured_logging import get_logger, log_context
+from agent_sigpesq.core.work_units import DELIVERY_DISK, DELIVERY_MEMORY, DownloadedReport, WorkUnit
+
+logger = get_logger(__name__)
+
 class ReportDownloadStrategy(ABC):
     """
     Abstract base class for report download strategies.
     
     This class defines the methods required to implement a download strategy
     for a specific category of reports on the Sigpesq portal.
+
+    Attributes:
+        circuit_breaker (Optional[CircuitBreaker]): Breaker shared with the
+            service and the other strategies; set by `SigpesqReportService`.
+        years (Optional[Collection[str]]): Years to download, for categories
+            split by year; all available years when None.
+        delivery (str): "disk" to save reports under the reports tree, or
+            "memory" to hand them over in memory without persisting them.
     """
+
+    circuit_breaker: Optional[CircuitBreaker] = None
+    years: Optional[Collection[str]] = None
+    delivery: str = DELIVERY_DISK
     
     @abstractmethod
     def get_category_name(self) -> str:
@@ -38,20 +58,100 @@ class ReportDownloadStrategy(ABC):
         """
         pass
         
+    def get_category_key(self) -> str:
+        """
+        Returns the short identifier used to select this category (e.g., from the CLI).
+
+        Returns:
+            str: The category key (e.g., "advisorships").
+        """
+        return self.get_category_name().lower().replace(" ", "_")
+
+    async def list_units(self, page: Page) -> List[WorkUnit]:
+        """
+        Enumerates the work units (report generations) of this category.
+
+        Categories with a single report return one unit; categories split
+        by year override this to return one unit per year.
+
+        Args:
+            page: The Playwright Page instance, already on the reports page.
+
+        Returns:
+            List[WorkUnit]: The units of this category, in a stable order.
+        """
+        return [WorkUnit(category=self.get_category_name())]
+
+    def pick_preflight_unit(self, units: List[WorkUnit]) -> Optional[WorkUnit]:
+        """
+        Picks a cheap unit of this category to measure the portal's latency with.
+
+        Args:
+            units (List[WorkUnit]): The selected units of this category.
+
+        Returns:
+            Optional[WorkUnit]: A unit whose report is small to generate, or
+            None if this category has no cheap unit (the default).
+        """
+        return None
+
     @abstractmethod
-    async def download(self, page: Page, reports_dir: str) -> bool:
+    async def download_unit(self, page: Page, reports_dir: str, unit: WorkUnit) -> Optional[DownloadedReport]:
         """
-        Executes the download process for this specific strategy.
+        Downloads the report for a single work unit.
 
         Args:
             page: The Playwright Page instance.
             reports_dir (str): The absolute path to the directory where reports should be saved.
+            unit (WorkUnit): The unit to download, as returned by `list_units`.
 
         Returns:
-            bool: True if the download was successful, False otherwise.
+            Optional[DownloadedReport]: The downloaded report, or None if the download failed.
         """
         pass
 
+    async def download(self, page: Page, reports_dir: str) -> bool:
+        """
+        Executes the download process for every unit of this strategy.
+
+        Args:
+            page: The Playwright Page instance.
+            reports_dir (str): The absolute path to the directory where reports should be saved.
+
+        Returns:
+            bool: True if at least one unit was downloaded successfully, False otherwise.
+        """
+        with log_context(category=self.get_category_name()):
+            logger.info(f"Processing {self.get_category_name()}...")
+
+            try:
+                units = await self.list_units(page)
+            except Exception as e:
+                logger.error(f"Error downloading {self.get_category_name()}: {e}")
+                return False
+
+        success_count = 0
+        for unit in units:
+            with log_context(category=unit.category, year=unit.year, phase="download"):
+                if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+                    logger.warning(f"Skipping {unit.key}: circuit breaker is open.")
+                    continue
+                try:
+                    report = await self.download_unit(page, reports_dir, unit)
+                except Exception as e:
+                    logger.error(f"Error downloading {unit.key}: {e}")
+                    report = None
+                # Counted per unit, since a degraded portal often fails before the download starts
+                if self.circuit_breaker is not None:
+                    if report:
+                        self.circuit_breaker.record_success()
+                    else:
+                        self.circuit_breaker.record_failure()
+                if report:
+                    success_count += 1
+
+        return success_count > 0
+
 class BasePlaywrightStrategy(ReportDownloadStrategy):
     """
     Base strategy providing common Playwright operations for report downloads.
@@ -67,7 +167,7 @@ class BasePlaywrightStrategy(ReportDownloadStrategy):
             if is_visible:
                 return
 
-            print(f"Button {button_id} not visible, attempting to open accordion '{accordion_text}'...")
+            logger.info(f"Button {button_id} not visible, attempting to open accordion '{accordion_text}'...")
             xpath = f"//div[contains(@class, 'accordionHeader') and contains(., '{accordion_text}')]"
             
             # Click the header
@@ -77,20 +177,26 @@ class BasePlaywrightStrategy(ReportDownloadStrategy):
             try:
                 await page.wait_for_selector(f"#{button_id}", state="visible", timeout=5000)
             except PlaywrightTimeoutError:
-                print(f"Warning: Button {button_id} still not visible after clicking accordion.")
+                logger.warning(f"Button {button_id} still not visible after clicking accordion.")
                 
         except Exception as e:
-            print(f"Error opening accordion '{accordion_text}': {e}")
+            logger.error(f"Error opening accordion '{accordion_text}': {e}")
 
-    async def _handle_download_and_move(self, page: Page, selector: str, download_dir: str, target_subdir: str) -> bool:
+    async def _handle_download_and_move(self, page: Page, selector: str, download_dir: str, target_subdir: str) -> Optional[DownloadedReport]:
         """
         Handles the download event and moves the file to the target directory.
+
+        In "memory" delivery the content is read into a buffer instead, and
+        Playwright's temporary copy is deleted right away.
+
+        Returns:
+            Optional[DownloadedReport]: The downloaded report, or None if the download failed.
         """
         try:
-            print(f"Waiting for download for target: {target_subdir}...")
+            logger.info(f"Waiting for download for target: {target_subdir}...")
             
             # Ensure target directory exists
-            if not os.path.exists(target_subdir):
+            if self.delivery == DELIVERY_DISK and not os.path.exists(target_subdir):
                 os.makedirs(target_subdir)
 
             async with page.expect_download(timeout=60000) as download_info:
@@ -101,16 +207,40 @@ class BasePlaywrightStrategy(ReportDownloadStrategy):
             
             # Use original filename from server
             original_filename = download.suggested_filename
-            dest_path = os.path.join(target_subdir, original_filename)
-            
-            # Handle overwrite
-            if os.path.exists(dest_path):
-                os.remove(dest_path)
+
+            if self.delivery == DELIVERY_MEMORY:
+                report = DownloadedReport(filename=original_filename, content=await self._read_download(download))
+                logger.info(f"Successfully downloaded {original_filename} into memory.")
+            else:
+                dest_path = os.path.join(target_subdir, original_filename)
                 
-            await download.save_as(dest_path)
-            print(f"Successfully downloaded and saved to: {dest_path}")
-            return True
+                # Handle overwrite
+                if os.path.exists(dest_path):
+                    os.remove(dest_path)
+                    
+                await download.save_as(dest_path)
+                logger.info(f"Successfully downloaded and saved to: {dest_path}")
+                report = DownloadedReport(filename=original_filename, path=dest_path)
+
+            return report
             
         except Exception as e:
-            print(f"Error during download handling: {e}")
-            return False
+            logger.error(f"Error during download handling: {e}")
+            return None
+
+    @staticmethod
+    async def _read_download(download) -> io.BytesIO:
+        """
+        Reads a download into memory and deletes Playwright's temporary file.
+        """
+        source = await download.path()
+        loop = asyncio.get_running_loop()
+
+        def read() -> bytes:
+            with open(source, "rb") as f:
+                return f.read()
+
+        try:
+            return io.BytesIO(await loop.run_in_executor(None, read))
+        finally:
+            await download.delete()
@@ -1,5 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, AsyncMock, patch, call
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.work_units import WorkUnit
 from agent_sigpesq.strategies.advisorships_strategy import AdvisorshipsDownloadStrategy
 
 class TestAdvisorshipsDownloadStrategy(unittest.IsolatedAsyncioTestCase):
@@ -41,3 +43,56 @@ class TestAdvisorshipsDownloadStrategy(unittest.IsolatedAsyncioTestCase):
             mock_open.side_effect = Exception("Accordion Error")
             result = await self.strategy.download(self.mock_page, self.reports_dir)
             self.assertFalse(result)
+
+    @patch('agent_sigpesq.strategies.advisorships_strategy.AdvisorshipsDownloadStrategy._ensure_accordion_open')
+    async def test_list_units(self, mock_ensure_accordion):
+        self.mock_page.is_visible.return_value = True
+        self.mock_page.eval_on_selector_all.return_value = ["", "2025", "2024"]
+
+        units = await self.strategy.list_units(self.mock_page)
+
+        self.assertEqual([u.key for u in units], ["Advisorships/2024", "Advisorships/2025"])
+
+    @patch('agent_sigpesq.strategies.advisorships_strategy.AdvisorshipsDownloadStrategy._ensure_accordion_open')
+    async def test_download_without_year_dropdown(self, mock_ensure_accordion):
+        self.mock_page.is_visible.return_value = False
+
+        result = await self.strategy.download(self.mock_page, self.reports_dir)
+
+        self.assertFalse(result)
+        self.mock_page.select_option.assert_not_called()
+
+    @patch('agent_sigpesq.strategies.advisorships_strategy.AdvisorshipsDownloadStrategy._handle_download_and_move')
+    @patch('agent_sigpesq.strategies.advisorships_strategy.AdvisorshipsDownloadStrategy._ensure_accordion_open')
+    async def test_download_selected_years_only(self, mock_ensure_accordion, mock_handle_download):
+        mock_handle_download.return_value = "/tmp/reports/advisorships/2025/report.xlsx"
+        self.mock_page.is_visible.return_value = True
+        self.mock_page.eval_on_selector_all.return_value = ["2023", "2024", "2025"]
+        strategy = AdvisorshipsDownloadStrategy(years={"2025", "2030"})
+
+        result = await strategy.download(self.mock_page, self.reports_dir)
+
+        self.assertTrue(result)
+        self.mock_page.select_option.assert_called_once_with("#ContentPlaceHolder_ddlRelOrientacao_Ano", value="2025")
+        self.assertEqual(mock_handle_download.call_count, 1)
+
+    @patch('agent_sigpesq.strategies.advisorships_strategy.AdvisorshipsDownloadStrategy._ensure_accordion_open')
+    async def test_failures_before_download_open_circuit(self, mock_ensure_accordion):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        self.strategy.circuit_breaker = breaker
+        self.mock_page.is_visible.return_value = True
+        self.mock_page.eval_on_selector_all.return_value = ["2023", "2024", "2025"]
+        # The portal times out before a download is ever started
+        self.mock_page.select_option.side_effect = Exception("Timeout 30000ms exceeded")
+
+        result = await self.strategy.download(self.mock_page, self.reports_dir)
+
+        self.assertFalse(result)
+        self.assertEqual(breaker.state, "open")
+        # The remaining years are skipped instead of timing out too
+        self.assertEqual(self.mock_page.select_option.call_count, 1)
+
+    def test_preflight_unit_is_latest_year(self):
+        units = [WorkUnit("Advisorships", year) for year in ["2023", "2025", "2024"]]
+        self.assertEqual(self.strategy.pick_preflight_unit(units).year, "2025")
+        self.assertIsNone(self.strategy.pick_preflight_unit([]))
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from agent_sigpesq.core.browser_factory import BrowserFactory
+
+def make_playwright(handlers):
+    playwright = MagicMock()
+
+    def new_context(*args, **kwargs):
+        context = MagicMock()
+        context.on.side_effect = lambda event, handler: handlers.append(handler)
+        return context
+
+    playwright.chromium.launch_persistent_context = AsyncMock(side_effect=new_context)
+    playwright.chromium.launch = AsyncMock()
+    return playwright
+
+class TestBrowserFactory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile_dir = self.tmp.name
+        # Context close handlers, which release the profile slot locks
+        self.handlers = []
+
+    def tearDown(self):
+        for handler in self.handlers:
+            handler(None)
+        self.tmp.cleanup()
+
+    async def test_ephemeral_context_by_default(self):
+        playwright = make_playwright(self.handlers)
+
+        await BrowserFactory.create_browser_context(playwright)
+
+        playwright.chromium.launch.assert_awaited_once()
+        playwright.chromium.launch_persistent_context.assert_not_called()
+
+    async def test_persistent_profile_with_cache_cap(self):
+        playwright = make_playwright(self.handlers)
+
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir, cache_size_mb=50)
+
+        call = playwright.chromium.launch_persistent_context.call_args
+        self.assertEqual(call.args[0], os.path.join(self.profile_dir, "slot-0"))
+        self.assertIn(f"--disk-cache-size={50 * 1024 * 1024}", call.kwargs["args"])
+
+    async def test_concurrent_runs_use_separate_slots(self):
+        playwright = make_playwright(self.handlers)
+
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir)
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir)
+
+        slots = [c.args[0] for c in playwright.chromium.launch_persistent_context.call_args_list]
+        self.assertEqual([os.path.basename(s) for s in slots], ["slot-0", "slot-1"])
+
+        # Closing the first context frees its slot for the next run
+        self.handlers[0](None)
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir)
+        self.assertEqual(os.path.basename(playwright.chromium.launch_persistent_context.call_args.args[0]), "slot-0")
+
+    async def test_falls_back_to_ephemeral_when_slots_are_busy(self):
+        playwright = make_playwright(self.handlers)
+
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir, max_profile_slots=1)
+        await BrowserFactory.create_browser_context(playwright, profile_dir=self.profile_dir, max_profile_slots=1)
+
+        self.assertEqual(playwright.chromium.launch_persistent_context.await_count, 1)
+        playwright.chromium.launch.assert_awaited_once()
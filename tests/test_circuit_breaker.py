@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.allow_request())
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertFalse(breaker.allow_request())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+        breaker.allow_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+    async def test_probe_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0, probe_attempts=2)
+        breaker.record_failure()
+        check = AsyncMock(side_effect=[False, True])
+
+        self.assertTrue(await breaker.probe(check))
+        self.assertEqual(check.call_count, 2)
+        self.assertTrue(breaker.allow_request())
+
+    async def test_probe_gives_up(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0, probe_attempts=2)
+        breaker.record_failure()
+        check = AsyncMock(side_effect=Exception("timeout"))
+
+        self.assertFalse(await breaker.probe(check))
+        self.assertEqual(breaker.state, "open")
+
+    async def test_acquire_waits_for_trial_outcome(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(await breaker.acquire())
+
+        waiters = [asyncio.ensure_future(breaker.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertFalse(any(w.done() for w in waiters))
+
+        breaker.record_success()
+        self.assertEqual(await asyncio.gather(*waiters), [True, True])
+
+    async def test_acquire_rejects_after_failed_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure()
+        breaker._opened_at -= 60
+        self.assertTrue(await breaker.acquire())
+
+        waiter = asyncio.ensure_future(breaker.acquire())
+        await asyncio.sleep(0)
+        breaker.record_failure()
+        self.assertFalse(await waiter)
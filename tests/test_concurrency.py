@@ -0,0 +1,65 @@
+import time
+import unittest
+from agent_sigpesq.core.concurrency import ConcurrencyController
+
+class TestConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        self.controller = ConcurrencyController(min_workers=1, max_workers=4, slow_navigation=5.0, slow_report=60.0)
+
+    def succeed(self, count, latency=1.0, category="Advisorships"):
+        for _ in range(count):
+            self.controller.record(time.monotonic(), latency, True, category)
+
+    def test_calibrate_from_navigation_headroom(self):
+        self.assertEqual(self.controller.calibrate(2.0, 3.0, "Advisorships"), 2)
+        self.assertEqual(self.controller.latency_target("Advisorships"), 6.0)
+        self.assertEqual(self.controller.calibrate(0.1, 3.0), 4)
+        self.assertEqual(self.controller.calibrate(9.0, 3.0), 1)
+
+    def test_calibrate_from_report_headroom(self):
+        # Fast navigation, but a slow cheap report means a loaded portal
+        self.assertEqual(self.controller.calibrate(0.1, 25.0), 2)
+        self.assertEqual(self.controller.calibrate(0.1, 90.0), 1)
+
+    def test_failed_preflight_starts_at_minimum(self):
+        self.assertEqual(self.controller.calibrate(0.1, None, "Advisorships"), 1)
+        self.assertIsNone(self.controller.latency_target("Advisorships"))
+
+    def test_additive_increase_after_a_full_window(self):
+        self.controller.calibrate(2.0, 3.0, "Advisorships")
+        self.succeed(2)
+        self.assertEqual(self.controller.limit, 3)
+        self.succeed(3)
+        self.assertEqual(self.controller.limit, 4)
+        self.succeed(10)
+        self.assertEqual(self.controller.limit, 4)
+
+    def test_multiplicative_decrease_on_slow_or_failed_download(self):
+        self.controller.calibrate(1.0, 3.0, "Advisorships")
+        self.controller.record(time.monotonic(), 7.0, True, "Advisorships")
+        self.assertEqual(self.controller.limit, 2)
+        self.controller.record(time.monotonic(), 1.0, False, "Advisorships")
+        self.assertEqual(self.controller.limit, 1)
+
+    def test_latency_baseline_per_category(self):
+        self.controller.calibrate(1.0, 3.0, "Advisorships")
+        # A heavier category is not slow just for being larger than the preflight report
+        self.succeed(1, latency=40.0, category="Research Groups")
+        self.succeed(2, latency=42.0, category="Research Groups")
+        self.assertEqual(self.controller.limit, 4)
+        self.assertEqual(self.controller.latency_target("Research Groups"), 80.0)
+
+        self.controller.record(time.monotonic(), 90.0, True, "Research Groups")
+        self.assertEqual(self.controller.limit, 2)
+
+    def test_ignores_downloads_started_before_the_last_change(self):
+        started = time.monotonic()
+        self.controller.calibrate(1.0, 3.0, "Advisorships")
+        self.controller.record(time.monotonic(), 1.0, False, "Advisorships")
+        # A download already in flight during the decrease does not shrink it again
+        self.controller.record(started, 1.0, False, "Advisorships")
+        self.assertEqual(self.controller.limit, 2)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            ConcurrencyController(min_workers=3, max_workers=2)
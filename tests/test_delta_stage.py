@@ -0,0 +1,122 @@
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from agent_sigpesq.core.work_units import WorkUnit
+from agent_sigpesq.services.delta_stage import ReportDeltaStage, read_report, _read_gzip_json
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+class TestReportDeltaStage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reports_dir = self.tmp.name
+        self.unit = WorkUnit("Advisorships", "2024")
+        self.report = os.path.join(self.reports_dir, "report.csv")
+        self.stage = ReportDeltaStage(
+            download_dir=self.reports_dir,
+            key_columns={"Advisorships": ["id"]},
+            snapshot_every=2,
+            keep_snapshots=1,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, rows):
+        write_csv(self.report, [["id", "name"]] + rows)
+        return self.stage.process(self.unit, self.report)
+
+    def test_read_report(self):
+        write_csv(self.report, [["id", "name"], ["1", "Ana"], ["", ""], ["2"]])
+        columns, data = read_report(self.report)
+        self.assertEqual(columns, ["id", "name"])
+        self.assertEqual(data, [["1", "Ana"], ["2", ""]])
+
+    def test_read_report_from_memory(self):
+        content = io.BytesIO("\ufeffid,name\n1,Ana\n".encode("utf-8"))
+        columns, data = read_report("report.csv", content)
+        self.assertEqual(columns, ["id", "name"])
+        self.assertEqual(data, [["1", "Ana"]])
+        # The buffer stays usable by the caller
+        self.assertEqual(content.tell(), 0)
+        self.assertFalse(content.closed)
+
+    @unittest.skipIf(importlib.util.find_spec("openpyxl") is None, "openpyxl is not installed")
+    def test_read_xlsx_report(self):
+        from datetime import date
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        for row in [["id", "name", "since"], [1, "Ana", date(2024, 3, 1)], [None, None, None], [2.0, "Bia"]]:
+            sheet.append(row)
+        path = os.path.join(self.reports_dir, "report.xlsx")
+        workbook.save(path)
+
+        columns, data = read_report(path)
+        self.assertEqual(columns, ["id", "name", "since"])
+        self.assertEqual(data, [["1", "Ana", "2024-03-01T00:00:00"], ["2", "Bia", ""]])
+
+        with open(path, "rb") as f:
+            content = io.BytesIO(f.read())
+        self.assertEqual(read_report("report.xlsx", content), (columns, data))
+        self.assertEqual(content.tell(), 0)
+
+    def test_first_version_is_snapshot(self):
+        entry = self.record([["1", "Ana"], ["2", "Bia"]])
+        self.assertEqual(entry["kind"], "snapshot")
+        self.assertEqual(entry["rows"], 2)
+
+    def test_delta_stores_only_changes(self):
+        self.record([["1", "Ana"], ["2", "Bia"], ["3", "Caio"]])
+        entry = self.record([["1", "Ana"], ["2", "Beatriz"], ["4", "Davi"]])
+
+        self.assertEqual(entry["kind"], "delta")
+        self.assertEqual((entry["inserted"], entry["updated"], entry["deleted"]), (1, 1, 1))
+
+        delta = _read_gzip_json(os.path.join(self.stage.unit_dir(self.unit), entry["file"]))
+        self.assertEqual(delta["inserted"]["values"], {"id": ["4"], "name": ["Davi"]})
+        self.assertEqual(delta["updated"]["values"], {"id": ["2"], "name": ["Beatriz"]})
+        self.assertEqual(delta["deleted"], ['["3"]'])
+
+        columns, rows = self.stage.load(self.unit)
+        self.assertEqual(columns, ["id", "name"])
+        self.assertEqual(list(rows.values()), [["1", "Ana"], ["2", "Beatriz"], ["4", "Davi"]])
+
+    def test_periodic_snapshot_and_compaction(self):
+        kinds = [self.record([["1", f"v{i}"]])["kind"] for i in range(4)]
+        self.assertEqual(kinds, ["snapshot", "delta", "delta", "snapshot"])
+
+        # Only the latest snapshot chain is retained
+        files = sorted(f for f in os.listdir(self.stage.unit_dir(self.unit)) if f.endswith(".gz"))
+        self.assertEqual(files, ["v000004-snapshot.json.gz"])
+        self.assertEqual(list(self.stage.load(self.unit)[1].values()), [["1", "v3"]])
+
+    def test_schema_change_forces_snapshot(self):
+        self.record([["1", "Ana"]])
+        write_csv(self.report, [["id", "name", "email"], ["1", "Ana", "ana@ifes.edu.br"]])
+        self.assertEqual(self.stage.process(self.unit, self.report)["kind"], "snapshot")
+
+    def test_duplicate_rows_without_key(self):
+        stage = ReportDeltaStage(download_dir=self.reports_dir)
+        write_csv(self.report, [["id", "name"], ["1", "Ana"], ["1", "Ana"]])
+        stage.process(self.unit, self.report)
+        self.assertEqual(len(stage.load(self.unit)[1]), 2)
+
+    def test_missing_key_column(self):
+        stage = ReportDeltaStage(download_dir=self.reports_dir, key_columns={"Advisorships": ["code"]})
+        write_csv(self.report, [["id", "name"], ["1", "Ana"]])
+        with self.assertRaises(ValueError):
+            stage.process(self.unit, self.report)
+
+    def test_drop_downloads_once_recorded(self):
+        stage = ReportDeltaStage(download_dir=self.reports_dir, keep_downloads=False)
+        write_csv(self.report, [["id", "name"], ["1", "Ana"]])
+        stage.process(self.unit, self.report)
+        self.assertFalse(os.path.exists(self.report))
+        self.assertEqual(list(stage.load(self.unit)[1].values()), [["1", "Ana"]])
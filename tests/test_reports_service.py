@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from agent_sigpesq.core.circuit_breaker import CircuitBreaker
+from agent_sigpesq.core.concurrency import ConcurrencyController
+from agent_sigpesq.core.work_units import DELIVERY_MEMORY, DownloadedReport, Shard, WorkUnit
+from agent_sigpesq.services.delta_stage import ReportDeltaStage
+from agent_sigpesq.services.reports_service import SigpesqLoginError, SigpesqReportService
+
+def make_strategy(category, years=None, success=True):
+    strategy = MagicMock()
+    strategy.get_category_name.return_value = category
+    units = [WorkUnit(category, year) for year in years] if years else [WorkUnit(category)]
+    strategy.list_units = AsyncMock(return_value=units)
+
+    async def download_unit(page, reports_dir, unit):
+        if not success:
+            return None
+        filename = f"{unit.key.replace('/', '_')}.csv"
+        if strategy.delivery == DELIVERY_MEMORY:
+            return DownloadedReport(filename=filename, content=io.BytesIO(b"id\n1\n"))
+        path = os.path.join(reports_dir, filename)
+        with open(path, "w") as f:
+            f.write("id\n1\n")
+        return DownloadedReport(filename=filename, path=path)
+
+    strategy.download_unit = AsyncMock(side_effect=download_unit)
+    return strategy
+
+class TestSigpesqReportService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reports_dir = self.tmp.name
+        self.mock_page = AsyncMock()
+        self.groups = make_strategy("Research Groups")
+        self.advisorships = make_strategy("Advisorships", years=["2023", "2024", "2025"])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_service(self, strategies, **kwargs):
+        return SigpesqReportService(download_dir=self.reports_dir, strategies=strategies, **kwargs)
+
+    async def test_download_all_units(self):
+        service = self.make_service([self.groups, self.advisorships])
+
+        result = await service._download_all_reports(self.mock_page)
+
+        self.assertTrue(result)
+        self.assertEqual(self.groups.download_unit.call_count, 1)
+        self.assertEqual(self.advisorships.download_unit.call_count, 3)
+        self.assertEqual(len(service.results), 4)
+
+        with open(os.path.join(self.reports_dir, "summary.json")) as f:
+            self.assertEqual(json.load(f)["succeeded"], 4)
+
+    async def test_results_describe_reports(self):
+        service = self.make_service([self.groups])
+
+        await service._download_all_reports(self.mock_page)
+
+        result = service.results[0]
+        self.assertEqual(result.size, 5)
+        self.assertEqual(result.sha256, hashlib.sha256(b"id\n1\n").hexdigest())
+        self.assertIsNotNone(result.started_at)
+        self.assertGreaterEqual(result.duration_seconds, 0)
+
+    @patch('agent_sigpesq.services.reports_service.BrowserFactory.create_browser_context')
+    @patch('agent_sigpesq.services.reports_service.async_playwright')
+    async def test_stream_reports_yields_each_unit(self, mock_playwright, mock_create_context):
+        mock_playwright.return_value.__aenter__.return_value = MagicMock()
+        mock_create_context.return_value.new_page.return_value = self.mock_page
+        service = self.make_service([self.groups, self.advisorships])
+        service._login = AsyncMock(return_value=True)
+
+        keys = [report.key async for report in service.stream_reports()]
+
+        self.assertEqual(keys, ["Research Groups", "Advisorships/2023", "Advisorships/2024", "Advisorships/2025"])
+        mock_create_context.return_value.close.assert_awaited_once()
+
+    @patch('agent_sigpesq.services.reports_service.BrowserFactory.create_browser_context')
+    @patch('agent_sigpesq.services.reports_service.async_playwright')
+    async def test_stream_reports_login_failure(self, mock_playwright, mock_create_context):
+        mock_playwright.return_value.__aenter__.return_value = MagicMock()
+        mock_create_context.return_value.new_page.return_value = self.mock_page
+        service = self.make_service([self.groups])
+        service._login = AsyncMock(return_value=False)
+
+        with self.assertRaises(SigpesqLoginError):
+            async for _ in service.stream_reports():
+                pass
+        self.assertFalse(await service.run())
+
+    async def test_memory_delivery(self):
+        service = self.make_service([self.groups, self.advisorships], delivery="memory")
+
+        reports = [report async for report in service._iter_units(self.mock_page)]
+
+        self.assertEqual(self.groups.delivery, "memory")
+        self.assertEqual(len(reports), 4)
+        for report in reports:
+            self.assertIsNone(report.path)
+            self.assertEqual(report.content.read(), b"id\n1\n")
+            self.assertEqual(report.sha256, hashlib.sha256(b"id\n1\n").hexdigest())
+            self.assertNotIn("content", report.to_dict())
+        # The service keeps no reference to the delivered content
+        self.assertTrue(all(r.content is None and r.sha256 for r in service.results))
+        # Nothing, not even the summary, is written to disk
+        self.assertEqual(os.listdir(self.reports_dir), [])
+
+    def test_unknown_delivery(self):
+        with self.assertRaises(ValueError):
+            self.make_service([self.groups], delivery="s3")
+
+    async def test_concurrent_downloads(self):
+        controller = ConcurrencyController(min_workers=1, max_workers=3, latency_tolerance=10)
+        service = self.make_service([self.groups, self.advisorships], concurrency=controller)
+        in_flight = []
+        peak = []
+
+        async def download_unit(page, reports_dir, unit):
+            in_flight.append(unit)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(unit)
+            return DownloadedReport(filename="report.csv", content=io.BytesIO(b"id\n"))
+
+        self.groups.download_unit.side_effect = download_unit
+        self.advisorships.download_unit.side_effect = download_unit
+        self.advisorships.pick_preflight_unit.side_effect = lambda units: units[-1]
+
+        result = await service._download_all_reports(self.mock_page)
+
+        self.assertTrue(result)
+        # The cheap preflight unit runs alone, then the calibrated workers run in parallel
+        self.assertEqual(peak[0], 1)
+        self.assertEqual(service.results[0].key, "Advisorships/2025")
+        self.assertEqual(len(service.results), 4)
+        self.assertEqual(controller.limit, 3)
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(self.mock_page.context.new_page.await_count, 2)
+
+    async def test_concurrent_worker_errors_fail_only_their_unit(self):
+        controller = ConcurrencyController(min_workers=3, max_workers=3)
+        breaker = CircuitBreaker(failure_threshold=10)
+        service = self.make_service([self.groups, self.advisorships], circuit_breaker=breaker, concurrency=controller)
+        # New worker pages time out while loading the reports page
+        worker_page = AsyncMock()
+        worker_page.goto.side_effect = Exception("Timeout 30000ms exceeded")
+        self.mock_page.context.new_page = AsyncMock(return_value=worker_page)
+
+        await service._download_all_reports(self.mock_page)
+
+        self.assertEqual(sorted(r.status for r in service.results), ["failed", "failed", "success", "success"])
+        self.assertEqual(breaker._failures, 2)
+        with open(os.path.join(self.reports_dir, "summary.json")) as f:
+            summary = json.load(f)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 2))
+
+    async def test_concurrent_units_wait_for_half_open_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        controller = ConcurrencyController(min_workers=3, max_workers=3)
+        # The preflight unit fails, so the remaining units start against a tripped breaker
+        self.groups.download_unit.side_effect = None
+        self.groups.download_unit.return_value = None
+
+        async def download_unit(page, reports_dir, unit):
+            await asyncio.sleep(0.01)
+            return DownloadedReport(filename="report.csv", content=io.BytesIO(b"id\n"))
+
+        self.advisorships.download_unit.side_effect = download_unit
+        service = self.make_service([self.groups, self.advisorships], circuit_breaker=breaker, concurrency=controller)
+
+        await service._download_all_reports(self.mock_page)
+
+        statuses = {r.key: r.status for r in service.results}
+        self.assertEqual(statuses, {
+            "Research Groups": "failed",
+            "Advisorships/2023": "success",
+            "Advisorships/2024": "success",
+            "Advisorships/2025": "success",
+        })
+        self.assertEqual(breaker.state, "closed")
+
+    async def test_delta_stage_off_the_event_loop(self):
+        stage = ReportDeltaStage(download_dir=self.reports_dir, keep_downloads=False)
+        threads = []
+        process = stage.process
+
+        def record_thread(*args):
+            threads.append(threading.current_thread())
+            return process(*args)
+
+        stage.process = record_thread
+        service = self.make_service([self.groups], delta_stage=stage)
+
+        await service._download_all_reports(self.mock_page)
+
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(len(threads), 1)
+        # The download was dropped once recorded, so the result no longer points at it
+        result = service.results[0]
+        self.assertIsNone(result.path)
+        self.assertIsNotNone(result.sha256)
+        self.assertFalse(os.path.exists(os.path.join(self.reports_dir, "Research Groups.csv")))
+        with open(os.path.join(self.reports_dir, "summary.json")) as f:
+            self.assertIsNone(json.load(f)["units"][0]["path"])
+
+    async def test_download_shard(self):
+        service = self.make_service([self.groups, self.advisorships], shard=Shard(2, 2))
+
+        result = await service._download_all_reports(self.mock_page)
+
+        self.assertTrue(result)
+        # Units are [Groups, 2023, 2024, 2025]; shard 2/2 gets 2023 and 2025
+        self.groups.download_unit.assert_not_called()
+        years = [c.args[2].year for c in self.advisorships.download_unit.call_args_list]
+        self.assertEqual(years, ["2023", "2025"])
+
+    async def test_failed_category(self):
+        projects = make_strategy("Research Projects", success=False)
+        service = self.make_service([self.groups, projects])
+
+        result = await service._download_all_reports(self.mock_page)
+
+        self.assertFalse(result)
+        self.assertEqual([r.status for r in service.results], ["success", "failed"])
+
+    @patch('agent_sigpesq.core.circuit_breaker.asyncio.sleep', new_callable=AsyncMock)
+    async def test_open_circuit_skips_remaining_units(self, mock_sleep):
+        advisorships = make_strategy("Advisorships", years=["2023", "2024", "2025"], success=False)
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        service = self.make_service([advisorships], circuit_breaker=breaker)
+        service._probe_portal = AsyncMock(return_value=False)
+
+        result = await service._download_all_reports(self.mock_page)
+
+        self.assertFalse(result)
+        self.assertIs(advisorships.circuit_breaker, breaker)
+        self.assertEqual(advisorships.download_unit.call_count, 1)
+        self.assertEqual([r.status for r in service.results], ["failed", "skipped", "skipped"])
+        # The recovery probe ran once, then the remaining units were skipped
+        service._probe_portal.assert_called_once()
+        mock_sleep.assert_called_once()
+
+    async def test_strategy_errors_count_as_breaker_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        self.groups.download_unit.side_effect = Exception("Timeout 30000ms exceeded")
+        service = self.make_service([self.groups, self.groups], circuit_breaker=breaker)
+
+        await service._download_all_reports(self.mock_page)
+
+        self.assertEqual([r.status for r in service.results], ["failed", "failed"])
+        self.assertTrue(breaker.is_open)
+
+    @patch('agent_sigpesq.core.circuit_breaker.asyncio.sleep', new_callable=AsyncMock)
+    async def test_failed_trials_exhaust_recovery(self, mock_sleep):
+        years = [str(year) for year in range(2016, 2026)]
+        advisorships = make_strategy("Advisorships", years=years, success=False)
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        service = self.make_service([advisorships], circuit_breaker=breaker)
+        # The portal still serves pages, but report generation keeps failing
+        service._probe_portal = AsyncMock(return_value=True)
+
+        await service._download_all_reports(self.mock_page)
+
+        # One failure opens the circuit; one probe lets a trial through, which fails too
+        self.assertEqual(advisorships.download_unit.call_count, 2)
+        self.assertEqual([r.status for r in service.results], ["failed", "failed"] + ["skipped"] * 8)
+        service._probe_portal.assert_called_once()
+        mock_sleep.assert_called_once()
+
+    async def test_only_units(self):
+        service = self.make_service([self.groups, self.advisorships], only_units={"Advisorships/2024"})
+
+        await service._download_all_reports(self.mock_page)
+
+        self.groups.download_unit.assert_not_called()
+        self.assertEqual([r.year for r in service.results], ["2024"])
+
+    def test_category_and_year_selection(self):
+        service = self.make_service(None, categories=["groups", "advisorships"], years={"2025"})
+
+        self.assertEqual([s.get_category_key() for s in service.strategies], ["groups", "advisorships"])
+        self.assertEqual(service.strategies[1].years, {"2025"})
+
+    def test_unknown_category(self):
+        with self.assertRaises(ValueError):
+            self.make_service(None, categories=["theses"])
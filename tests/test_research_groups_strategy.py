@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, AsyncMock, patch
+from agent_sigpesq.core.work_units import DELIVERY_MEMORY
 from agent_sigpesq.strategies.research_groups_strategy import ResearchGroupsDownloadStrategy
 
 class TestResearchGroupsDownloadStrategy(unittest.IsolatedAsyncioTestCase):
@@ -38,3 +41,28 @@ class TestResearchGroupsDownloadStrategy(unittest.IsolatedAsyncioTestCase):
             mock_open.side_effect = Exception("Accordion Error")
             result = await self.strategy.download(self.mock_page, self.reports_dir)
             self.assertFalse(result)
+
+    async def test_memory_delivery_reads_and_deletes_download(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "playwright-artifact")
+            with open(source, "wb") as f:
+                f.write(b"id\n1\n")
+            download = MagicMock()
+            download.suggested_filename = "grupos.xlsx"
+            download.path = AsyncMock(return_value=source)
+            download.delete = AsyncMock()
+            download_info = MagicMock()
+            download_info.__aenter__ = AsyncMock(return_value=download_info)
+            download_info.__aexit__ = AsyncMock(return_value=False)
+            download_info.value = AsyncMock(return_value=download)()
+            self.mock_page.expect_download = MagicMock(return_value=download_info)
+            self.strategy.delivery = DELIVERY_MEMORY
+            target_subdir = os.path.join(tmp, "reports", "research_group")
+
+            report = await self.strategy._handle_download_and_move(self.mock_page, "#btn", tmp, target_subdir)
+
+            self.assertEqual(report.filename, "grupos.xlsx")
+            self.assertIsNone(report.path)
+            self.assertEqual(report.content.getvalue(), b"id\n1\n")
+            download.delete.assert_awaited_once()
+            self.assertFalse(os.path.exists(target_subdir))
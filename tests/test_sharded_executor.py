@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from agent_sigpesq.core.work_units import SUMMARY_DIRNAME, SUMMARY_FILENAME, Shard, UnitResult, write_shard_summary
+from agent_sigpesq.services.sharded_executor import LocalShardExecutor
+
+def thread_pool(max_workers, mp_context=None):
+    # Runs the shards in threads, so the stub needs no browser or spawned interpreter
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+class TestLocalShardExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reports_dir = self.tmp.name
+        self.shards = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_shard(self, shard, headless, download_dir, *args):
+        """Stub of `_run_shard` writing one successful unit per shard."""
+        with self.lock:
+            self.shards.append(shard)
+        write_shard_summary(download_dir, shard, [
+            UnitResult("Advisorships", str(2020 + shard.index), status="success", shard=str(shard)),
+        ])
+        return True
+
+    async def run_executor(self, run_shard, workers=3):
+        executor = LocalShardExecutor(workers=workers, download_dir=self.reports_dir)
+        with patch("agent_sigpesq.services.sharded_executor.ProcessPoolExecutor", thread_pool), \
+             patch("agent_sigpesq.services.sharded_executor._run_shard", run_shard):
+            return await executor.run()
+
+    def read_summary(self):
+        with open(os.path.join(self.reports_dir, SUMMARY_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+
+    async def test_runs_every_shard_and_merges_summaries(self):
+        result = await self.run_executor(self.run_shard)
+
+        self.assertTrue(result)
+        self.assertEqual(sorted(self.shards, key=lambda s: s.index), [Shard(1, 3), Shard(2, 3), Shard(3, 3)])
+        summary = self.read_summary()
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["succeeded"], 3)
+        self.assertEqual(sorted(u["shard"] for u in summary["units"]), ["1/3", "2/3", "3/3"])
+
+    async def test_clears_stale_shard_summaries(self):
+        # Left by a previous run with four shards
+        write_shard_summary(self.reports_dir, Shard(4, 4), [
+            UnitResult("Research Groups", status="failed", shard="4/4"),
+        ])
+
+        await self.run_executor(self.run_shard)
+
+        self.assertFalse(os.path.exists(os.path.join(self.reports_dir, SUMMARY_DIRNAME, "shard-4-of-4.json")))
+        summary = self.read_summary()
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["failed"], 0)
+
+    async def test_crashed_shard_fails_the_run(self):
+        def run_shard(shard, *args):
+            if shard.index == 2:
+                raise RuntimeError("browser crashed")
+            return self.run_shard(shard, *args)
+
+        result = await self.run_executor(run_shard)
+
+        self.assertFalse(result)
+        # The surviving shards are still merged
+        self.assertEqual(self.read_summary()["total"], 2)
+
+    async def test_failed_shard_fails_the_run(self):
+        def run_shard(shard, *args):
+            self.run_shard(shard, *args)
+            return shard.index != 3
+
+        self.assertFalse(await self.run_executor(run_shard))
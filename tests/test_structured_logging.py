@@ -0,0 +1,56 @@
+import io
+import json
+import unittest
+from agent_sigpesq.core.structured_logging import (
+    configure_logging,
+    get_logger,
+    log_context,
+    shutdown_logging,
+)
+
+class TestStructuredLogging(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = get_logger("tests")
+
+    def tearDown(self):
+        shutdown_logging()
+
+    def lines(self):
+        shutdown_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_lines_with_context(self):
+        run_id = configure_logging(level="INFO", run_id="run-1", stream=self.stream)
+        with log_context(category="Advisorships", phase="download"):
+            with log_context(year="2024"):
+                self.logger.info("Downloading %s", "report")
+            self.logger.info("Done")
+
+        lines = self.lines()
+        self.assertEqual(run_id, "run-1")
+        self.assertEqual(lines[0]["message"], "Downloading report")
+        self.assertEqual(lines[0]["logger"], "agent_sigpesq.tests")
+        self.assertEqual(
+            (lines[0]["run_id"], lines[0]["category"], lines[0]["year"], lines[0]["phase"]),
+            ("run-1", "Advisorships", "2024", "download"),
+        )
+        self.assertIsNone(lines[1]["year"])
+
+    def test_level_filtering(self):
+        configure_logging(level="WARNING", stream=self.stream)
+        self.logger.info("hidden")
+        self.logger.warning("shown")
+
+        self.assertEqual([line["message"] for line in self.lines()], ["shown"])
+
+    def test_exception_is_serialised(self):
+        configure_logging(stream=self.stream)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            self.logger.exception("Failed")
+
+        line = self.lines()[0]
+        self.assertEqual(line["level"], "ERROR")
+        self.assertIn("RuntimeError: boom", line["exception"])
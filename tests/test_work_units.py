@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from agent_sigpesq.core.work_units import (
+    Shard,
+    UnitResult,
+    WorkUnit,
+    load_pending_units,
+    merge_shard_summaries,
+    parse_years,
+    write_shard_summary,
+)
+
+class TestShard(unittest.TestCase):
+    def test_parse(self):
+        shard = Shard.parse("2/4")
+        self.assertEqual(shard, Shard(index=2, count=4))
+        self.assertEqual(str(shard), "2/4")
+
+    def test_parse_invalid(self):
+        for spec in ["2", "a/b", "0/4", "5/4", "1/0"]:
+            with self.assertRaises(ValueError):
+                Shard.parse(spec)
+
+    def test_select_partitions_units(self):
+        units = [WorkUnit("Advisorships", str(year)) for year in range(2016, 2026)]
+        shards = [Shard(index, 3).select(units) for index in range(1, 4)]
+
+        # Every unit is assigned to exactly one shard
+        selected = [unit for shard_units in shards for unit in shard_units]
+        self.assertEqual(sorted(selected, key=lambda u: u.key), units)
+        self.assertEqual([len(s) for s in shards], [4, 3, 3])
+
+    def test_default_shard_selects_everything(self):
+        units = [WorkUnit("Research Groups"), WorkUnit("Research Projects")]
+        self.assertEqual(Shard().select(units), units)
+
+class TestParseYears(unittest.TestCase):
+    def setUp(self):
+        self.today = date(2025, 3, 1)
+
+    def test_range(self):
+        self.assertEqual(parse_years("2022-2024", self.today), {"2022", "2023", "2024"})
+
+    def test_keywords(self):
+        self.assertEqual(parse_years("current", self.today), {"2025"})
+        self.assertEqual(parse_years("previous-current", self.today), {"2024", "2025"})
+
+    def test_list(self):
+        self.assertEqual(parse_years("2019, 2022-2023", self.today), {"2019", "2022", "2023"})
+
+    def test_invalid(self):
+        for spec in ["", "24", "2025-2024", "next", "2024-"]:
+            with self.assertRaises(ValueError):
+                parse_years(spec, self.today)
+
+class TestShardSummaries(unittest.TestCase):
+    def test_merge(self):
+        with tempfile.TemporaryDirectory() as reports_dir:
+            write_shard_summary(reports_dir, Shard(1, 2), [
+                UnitResult("Research Groups", status="success", shard="1/2"),
+            ])
+            write_shard_summary(reports_dir, Shard(2, 2), [
+                UnitResult("Advisorships", "2024", status="failed", shard="2/2"),
+            ])
+
+            summary = merge_shard_summaries(reports_dir)
+
+            self.assertEqual(summary["shards"], ["1/2", "2/2"])
+            self.assertEqual(summary["total"], 2)
+            self.assertEqual(summary["succeeded"], 1)
+            self.assertEqual(summary["failed"], 1)
+            with open(os.path.join(reports_dir, "summary.json")) as f:
+                self.assertEqual(json.load(f), summary)
+
+    def test_load_pending_units(self):
+        with tempfile.TemporaryDirectory() as reports_dir:
+            write_shard_summary(reports_dir, Shard(), [
+                UnitResult("Research Groups", status="success"),
+                UnitResult("Advisorships", "2024", status="failed"),
+                UnitResult("Advisorships", "2025", status="skipped"),
+            ])
+            merge_shard_summaries(reports_dir)
+
+            self.assertEqual(load_pending_units(reports_dir), {"Advisorships/2024", "Advisorships/2025"})